@@ -6,6 +6,7 @@ import logging
 
 from . import abc, utils
 from .asset import Asset
+from .cache import CachePolicy, CacheRule, UploadCache
 from .channel import ChannelType, ChatChannel, DMChannel, Thread
 from .client import Client
 from .colour import Color, Colour
@@ -19,10 +20,12 @@ from .errors import (
     GuildedException,
     GuildedServerError,
     HTTPException,
+    MediaTooLarge,
     NotFound,
     TooManyRequests,
 )
 from .file import File, FileType, MediaType, Attachment
+from .http import RequestTrace
 from .message import ChatMessage, Message, MessageMention, MentionType
 from .presence import Presence
 from .status import Game, TransientStatus
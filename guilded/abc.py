@@ -58,9 +58,13 @@ from .embed import _EmptyEmbed, Embed
 from .file import MediaType, FileType, File
 from .message import Message
 from .presence import Presence
-from .utils import ISO8601
+from .utils import lazy_timestamp
 
 class Messageable(metaclass=abc.ABCMeta):
+    # storage for these is declared by subclasses so that they can be mixed
+    # with other slotted bases such as User
+    __slots__ = ()
+
     def __init__(self, *, state, data):
         self._state = state
         self.id = data.get('id')
@@ -99,15 +103,8 @@ class Messageable(metaclass=abc.ABCMeta):
         """
         content = list(content)
         if kwargs.get('file'):
-            file = kwargs.get('file')
-            file.set_media_type(MediaType.attachment)
-            if file.url is None:
-                await file._upload(self._state)
-            content.append(file)
+            content.append(kwargs.get('file'))
         for file in kwargs.get('files') or []:
-            file.set_media_type(MediaType.attachment)
-            if file.url is None:
-                await file._upload(self._state)
             content.append(file)
 
         def embed_attachment_uri(embed):
@@ -126,11 +123,12 @@ class Messageable(metaclass=abc.ABCMeta):
 
             return embed
 
-        # upload Files passed positionally
-        for node in content:
-            if isinstance(node, File) and node.url is None:
-                node.set_media_type(MediaType.attachment)
-                await node._upload(self._state)
+        # upload every File at once
+        files = [node for node in content if isinstance(node, File)]
+        for file in files:
+            if file.url is None:
+                file.set_media_type(MediaType.attachment)
+        await self._state.upload_files(files)
 
         # handle attachment URIs for Embeds passed positionally
         # this is a separate loop to ensure that all files are uploaded first
@@ -160,9 +158,16 @@ class Messageable(metaclass=abc.ABCMeta):
             message_payload['isPrivate'] = kwargs.get('private', False)
 
         share_urls = [message.share_url for message in kwargs.get('share', []) if message.share_url is not None]
-        response_coro, payload = self._state.send_message(self._channel_id, content, message_payload, share_urls=share_urls)
-        response = await response_coro
-        payload['createdAt'] = response.pop('message', response or {}).pop('createdAt', None)
+        if self._state._send_queue is not None:
+            response, payload = await self._state._send_queue.send(self._channel_id, content, message_payload, share_urls=share_urls)
+        else:
+            response_coro, payload = self._state.send_message(self._channel_id, content, message_payload, share_urls=share_urls)
+            response = await response_coro
+
+        # the payload and response may be shared with other queued sends
+        # that were merged into the same message, so they are not modified
+        payload = dict(payload)
+        payload['createdAt'] = (response.get('message') or response or {}).get('createdAt')
         payload['id'] = payload.pop('messageId')
         try:
             payload['channelId'] = getattr(self, 'id', getattr(self, 'channel', None).id)
@@ -214,43 +219,122 @@ class Messageable(metaclass=abc.ABCMeta):
         return message
 
 class User(metaclass=abc.ABCMeta):
+    # users are cached in very large numbers, so only commonly used fields
+    # are stored as attributes. the rest are read from the payload on demand
+    __slots__ = (
+        '_state',
+        '_data',
+        '_channel_id',
+        'type',
+        'id',
+        'name',
+        'colour',
+        'subdomain',
+        'presence',
+        '_blocked_at',
+        '_online_at',
+        '_created_at',
+        'bot',
+        'friend_status',
+        '_friend_requested_at',
+        '__weakref__',
+    )
+
+    blocked_at = lazy_timestamp()
+    online_at = lazy_timestamp()
+    created_at = lazy_timestamp()
+    friend_requested_at = lazy_timestamp()
+
     def __init__(self, *, state, data, **extra):
         self._state = state
         data = data.get('user', data)
+        self._data = data
 
         self.type = None
         self.id = data.get('id')
+        self._channel_id = None
         self.name = data.get('name')
         self.colour = Colour(0)
         self.subdomain = data.get('subdomain')
-        self.email = data.get('email')
-        self.service_email = data.get('serviceEmail')
-        self.games = data.get('aliases', [])
-        self.bio = (data.get('aboutInfo') or {}).get('bio') or ''
-        self.tagline = (data.get('aboutInfo') or {}).get('tagLine') or ''
         self.presence = Presence.from_value(data.get('userPresenceStatus', 5))
-        status = data.get('userStatus', {})
-        if status.get('content'):
-            self.status = Activity.build(status['content'])
-        else:
-            self.status = None
 
-        self.blocked_at = ISO8601(data.get('blockedDate'))
-        self.online_at = ISO8601(data.get('lastOnline'))
-        self.created_at = ISO8601(data.get('createdAt') or data.get('joinDate'))
+        self.blocked_at = data.get('blockedDate')
+        self.online_at = data.get('lastOnline')
+        self.created_at = data.get('createdAt') or data.get('joinDate')
         # in profilev3, createdAt is returned instead of joinDate
 
-        self.avatar_url = Asset('profilePicture', state=self._state, data=data)
-        self.banner_url = Asset('profileBanner', state=self._state, data=data)
-
-        self.moderation_status = data.get('moderationStatus')
-        self.badges = data.get('badges') or []
-        self.stonks = data.get('stonks')
-
         self.bot = data.get('bot', extra.get('bot', False))
 
         self.friend_status = extra.get('friend_status')
-        self.friend_requested_at = ISO8601(extra.get('friend_created_at'))
+        self.friend_requested_at = extra.get('friend_created_at')
+
+    def _update(self, data):
+        # merges a partial payload, such as one from the gateway or from
+        # another team's member list, into this user
+        data = {key: value for key, value in data.get('user', data).items() if value is not None}
+        self._data = {**self._data, **data}
+
+        if 'name' in data:
+            self.name = data['name']
+        if 'subdomain' in data:
+            self.subdomain = data['subdomain']
+        if 'userPresenceStatus' in data:
+            self.presence = Presence.from_value(data['userPresenceStatus'])
+        if 'blockedDate' in data:
+            self.blocked_at = data['blockedDate']
+        if 'lastOnline' in data:
+            self.online_at = data['lastOnline']
+        if 'createdAt' in data:
+            self.created_at = data['createdAt']
+        if 'bot' in data:
+            self.bot = data['bot']
+
+    @property
+    def email(self):
+        return self._data.get('email')
+
+    @property
+    def service_email(self):
+        return self._data.get('serviceEmail')
+
+    @property
+    def games(self):
+        return self._data.get('aliases', [])
+
+    @property
+    def bio(self):
+        return (self._data.get('aboutInfo') or {}).get('bio') or ''
+
+    @property
+    def tagline(self):
+        return (self._data.get('aboutInfo') or {}).get('tagLine') or ''
+
+    @property
+    def status(self):
+        status = self._data.get('userStatus') or {}
+        if status.get('content'):
+            return Activity.build(status['content'])
+        return None
+
+    @property
+    def avatar_url(self):
+        return Asset('profilePicture', state=self._state, data=self._data)
+
+    @property
+    def banner_url(self):
+        return Asset('profileBanner', state=self._state, data=self._data)
+
+    @property
+    def moderation_status(self):
+        return self._data.get('moderationStatus')
+
+    @property
+    def badges(self):
+        return self._data.get('badges') or []
+
+    @property
+    def stonks(self):
+        return self._data.get('stonks')
 
     def __str__(self):
         return self.name
@@ -305,10 +389,43 @@ class User(metaclass=abc.ABCMeta):
         return Messageable(state=self._state, data=dm)
 
 class TeamChannel(Messageable):
+    __slots__ = (
+        '_state',
+        '_data',
+        '_channel_id',
+        'type',
+        'id',
+        'group',
+        'group_id',
+        'team',
+        'team_id',
+        'name',
+        'position',
+        'description',
+        'slug',
+        'public',
+        '_created_at',
+        '_updated_at',
+        '_added_at',
+        '_archived_at',
+        '_auto_archive_at',
+        'created_by',
+        'archived_by',
+        'parent_id',
+        'parent',
+    )
+
+    created_at = lazy_timestamp()
+    updated_at = lazy_timestamp()
+    added_at = lazy_timestamp()
+    archived_at = lazy_timestamp()
+    auto_archive_at = lazy_timestamp()
+
     def __init__(self, *, state, group, data, **extra):
         super().__init__(state=state, data=data)
         #self._state = state
         data = data.get('data') or data.get('channel') or data
+        self._data = data
         self.group = group
         self.group_id = data.get('groupId') or getattr(self.group, 'id', None)
 
@@ -319,24 +436,17 @@ class TeamChannel(Messageable):
         self.position = data.get('priority')
         self.description = data.get('description')
         self.slug = data.get('slug')
-        self.roles_synced = data.get('isRoleSynced')
         self.public = data.get('isPublic', False)
-        self.settings = data.get('settings')  # no clue
-
-        self.created_at = ISO8601(data.get('createdAt'))
-        self.updated_at = ISO8601(data.get('updatedAt'))
-        self.added_at = ISO8601(data.get('addedAt'))  # i have no idea what this is
-        self.archived_at = ISO8601(data.get('archivedAt'))
-        self.auto_archive_at = ISO8601(data.get('autoArchiveAt'))
-        created_by = extra.get('created_by') or self._state._get_team_member(self.team_id, extra.get('createdBy'))
-        if created_by is None:
-            if data.get('createdByInfo'):
-                self.created_by = self._state.create_member(data=data.get('createdByInfo'))
-        else:
-            self.created_by = created_by
+
+        self.created_at = data.get('createdAt')
+        self.updated_at = data.get('updatedAt')
+        self.added_at = data.get('addedAt')  # i have no idea what this is
+        self.archived_at = data.get('archivedAt')
+        self.auto_archive_at = data.get('autoArchiveAt')
+        self.created_by = extra.get('created_by') or self._state._get_team_member(self.team_id, extra.get('createdBy'))
+        if self.created_by is None and data.get('createdByInfo'):
+            self.created_by = self._state.create_member(data=data.get('createdByInfo'), partial=True)
         self.archived_by = extra.get('archived_by') or self._state._get_team_member(self.team_id, extra.get('archivedBy'))
-        self.created_by_webhook_id = data.get('createdByWebhookId')
-        self.archived_by_webhook_id = data.get('archivedByWebhookId')
 
         self.parent_id = data.get('parentChannelId') or data.get('originatingChannelId')
         # latter is probably only on threads
@@ -345,6 +455,22 @@ class TeamChannel(Messageable):
         else:
             self.parent = None
 
+    @property
+    def roles_synced(self):
+        return self._data.get('isRoleSynced')
+
+    @property
+    def settings(self):
+        return self._data.get('settings')  # no clue
+
+    @property
+    def created_by_webhook_id(self):
+        return self._data.get('createdByWebhookId')
+
+    @property
+    def archived_by_webhook_id(self):
+        return self._data.get('archivedByWebhookId')
+
     @property
     def topic(self):
         return self.description
@@ -49,10 +49,94 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 
+import asyncio
 from io import BytesIO
-
-
-class Asset:
+import os
+
+
+class AssetMixin:
+    """Downloading for media with a ``url``, shared by :class:`Asset` and
+    :class:`Attachment`.
+
+    Media is streamed and never decoded as text. Every method accepts
+    ``max_size``, the most bytes to allow before raising
+    :exc:`MediaTooLarge`, and ``range``, a ``(start, end)`` tuple of inclusive
+    byte offsets to download only part of the media (``end`` may be
+    ``None``).
+    """
+    async def read(self, *, max_size=None, range=None):
+        """|coro|
+
+        Download this media.
+
+        Returns
+        ---------
+        :class:`bytes`
+        """
+        return await self._state.read_media(self.url, max_size=max_size, range=range)
+
+    def stream(self, *, chunk_size=65536, max_size=None, range=None):
+        """Download this media in chunks, for handling large media without
+        holding it all in memory.
+
+        .. code-block:: python3
+
+            async for chunk in attachment.stream():
+                hasher.update(chunk)
+
+        Returns
+        ---------
+        AsyncIterator[:class:`bytes`]
+        """
+        return self._state.stream_media(self.url, chunk_size=chunk_size, max_size=max_size, range=range)
+
+    async def save(self, fp, *, chunk_size=65536, max_size=None, range=None):
+        """|coro|
+
+        Download this media into a file, one chunk at a time.
+
+        Parameters
+        ------------
+        fp: Union[:class:`str`, :class:`io.BufferedIOBase`]
+            A path to write to, or a file opened in binary write mode. A path
+            is written to off the event loop, and is removed if the download
+            fails.
+
+        Returns
+        ---------
+        :class:`int`
+            The number of bytes written.
+        """
+        chunks = self.stream(chunk_size=chunk_size, max_size=max_size, range=range)
+        written = 0
+        if not isinstance(fp, str):
+            async for chunk in chunks:
+                written += fp.write(chunk)
+            return written
+
+        loop = asyncio.get_event_loop()
+        file = await loop.run_in_executor(None, open, fp, 'wb')
+        try:
+            async for chunk in chunks:
+                written += await loop.run_in_executor(None, file.write, chunk)
+        except BaseException:
+            file.close()
+            os.remove(fp)
+            raise
+        else:
+            file.close()
+        return written
+
+    async def bytesio(self, **kwargs):
+        """|coro|
+
+        Download this media into a :class:`io.BytesIO`. Takes the same
+        keyword arguments as :meth:`read`.
+        """
+        return BytesIO(await self.read(**kwargs))
+
+
+class Asset(AssetMixin):
     FRIENDLY = {
         'sm': 'small',
         'md': 'medium',
@@ -82,9 +166,3 @@ class Asset:
 
     def __eq__(self, other):
         return self.url is not None and other.url is not None and self.url == other.url
-
-    async def read(self):
-        return await self._state.read_filelike_data(self)
-
-    async def bytesio(self):
-        return BytesIO(await self._state.read_filelike_data(self))
@@ -0,0 +1,478 @@
+"""
+MIT License
+
+Copyright (c) 2020-present shay (shayypy)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+------------------------------------------------------------------------------
+
+This project includes code from https://github.com/Rapptz/discord.py, which is
+available under the MIT license:
+
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from collections import OrderedDict
+import dbm
+from operator import attrgetter, itemgetter
+import time
+
+from . import utils
+
+
+class LRUCache:
+    """A bounded, least-recently-used cache of models.
+
+    Inserting, looking up and evicting an item are all constant-time
+    operations regardless of the size of the cache.
+
+    Parameters
+    ------------
+    max_size: Optional[:class:`int`]
+        The maximum number of items to store. ``None`` means unbounded.
+    max_per_group: Optional[:class:`int`]
+        The maximum number of items to store for any one group (such as a
+        channel or team). When a group exceeds this, its least recently used
+        item is evicted. ``None`` means no per-group limit.
+    ttl: Optional[:class:`float`]
+        The number of seconds an item may go unaccessed before it expires
+        from the cache. ``None`` means items never expire.
+    key: Callable[[Any], Hashable]
+        Returns the key to store an item by. Defaults to its ``id``.
+    group: Optional[Callable[[Any], Hashable]]
+        Returns the group an item belongs to, if items should be grouped.
+
+    Attributes
+    ------------
+    hits: :class:`int`
+        The number of lookups that found an item.
+    misses: :class:`int`
+        The number of lookups that did not find an item (including those
+        that found an expired one).
+    evictions: :class:`int`
+        The number of items removed to respect the size limits or ``ttl``.
+    """
+    def __init__(self, max_size=None, *, max_per_group=None, ttl=None, key=attrgetter('id'), group=None):
+        self.max_size = max_size
+        self.max_per_group = max_per_group
+        self.ttl = ttl
+        self._key = key
+        self._group = group
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # key -> (item, last accessed). ordered from least to most recently
+        # used, which is also the order of expiry
+        self._items = OrderedDict()
+        # group -> OrderedDict of keys, ordered the same way
+        self._groups = {}
+
+    def __len__(self):
+        self._expire()
+        return len(self._items)
+
+    def __contains__(self, key):
+        entry = self._items.get(key)
+        return entry is not None and not self._expired(entry[1], time.monotonic())
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} size={len(self._items)} max_size={self.max_size!r} hits={self.hits} misses={self.misses} evictions={self.evictions}>'
+
+    @property
+    def stats(self):
+        """:class:`dict`: The hit, miss, and eviction counters, as well as the
+        current size of the cache."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self),
+        }
+
+    def _expired(self, accessed_at, now):
+        return self.ttl is not None and now - accessed_at > self.ttl
+
+    def _pop(self, key):
+        item, _ = self._items.pop(key)
+        if self._group is not None:
+            group_key = self._group(item)
+            group = self._groups.get(group_key)
+            if group is not None:
+                group.pop(key, None)
+                if not group:
+                    del self._groups[group_key]
+        return item
+
+    def _expire(self):
+        if self.ttl is None:
+            return
+        now = time.monotonic()
+        while self._items:
+            key, (_, accessed_at) = next(iter(self._items.items()))
+            if not self._expired(accessed_at, now):
+                break
+            self._pop(key)
+            self.evictions += 1
+
+    def get(self, key, *, touch=True):
+        """Get an item by its key, marking it as recently used unless
+        ``touch`` is ``False``. Returns ``None`` if it is not cached."""
+        entry = self._items.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        item, accessed_at = entry
+        now = time.monotonic()
+        if self._expired(accessed_at, now):
+            self._pop(key)
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        if touch:
+            self._items[key] = (item, now)
+            self._items.move_to_end(key)
+            if self._group is not None:
+                group = self._groups.get(self._group(item))
+                if group is not None:
+                    group.move_to_end(key)
+
+        self.hits += 1
+        return item
+
+    def add(self, item):
+        """Store an item, replacing any existing item with the same key and
+        evicting the least recently used items if a limit is exceeded."""
+        key = self._key(item)
+        if key in self._items:
+            self._pop(key)
+
+        self._items[key] = (item, time.monotonic())
+
+        if self._group is not None:
+            group = self._groups.get(self._group(item))
+            if group is None:
+                group = self._groups[self._group(item)] = OrderedDict()
+            group[key] = None
+
+            if self.max_per_group is not None:
+                while len(group) > self.max_per_group:
+                    self._pop(next(iter(group)))
+                    self.evictions += 1
+
+        if self.max_size is not None:
+            while len(self._items) > self.max_size:
+                self._pop(next(iter(self._items)))
+                self.evictions += 1
+
+        self._expire()
+
+    def remove(self, key):
+        """Remove an item from the cache, returning it if it was present."""
+        try:
+            return self._pop(key)
+        except KeyError:
+            return None
+
+    def values(self):
+        """List[Any]: Every unexpired item in the cache, from least to most
+        recently used."""
+        self._expire()
+        return [item for item, _ in self._items.values()]
+
+    def group_values(self, group):
+        """List[Any]: Every unexpired item in a group, from least to most
+        recently used."""
+        self._expire()
+        keys = self._groups.get(group)
+        if not keys:
+            return []
+        return [self._items[key][0] for key in keys]
+
+    def clear(self):
+        """Remove every item from the cache. The counters are kept."""
+        self._items.clear()
+        self._groups.clear()
+
+
+class MessageCache(LRUCache):
+    """A bounded, least-recently-used cache of :class:`ChatMessage` objects,
+    grouped by channel.
+
+    Parameters
+    ------------
+    max_messages: Optional[:class:`int`]
+        The maximum number of messages to store. ``None`` means unbounded.
+    max_messages_per_channel: Optional[:class:`int`]
+        The maximum number of messages to store for any one channel. When a
+        channel exceeds this, its least recently used message is evicted.
+        ``None`` means no per-channel limit.
+    ttl: Optional[:class:`float`]
+        The number of seconds a message may go unaccessed before it expires
+        from the cache. ``None`` means messages never expire.
+    """
+    def __init__(self, max_messages=1000, *, max_messages_per_channel=None, ttl=None):
+        super().__init__(
+            max_messages,
+            max_per_group=max_messages_per_channel,
+            ttl=ttl,
+            group=attrgetter('channel_id')
+        )
+
+    @property
+    def max_messages(self):
+        return self.max_size
+
+    @property
+    def max_messages_per_channel(self):
+        return self.max_per_group
+
+
+class CacheRule:
+    """How one kind of model is cached, as part of a :class:`CachePolicy`.
+
+    Parameters
+    ------------
+    enabled: :class:`bool`
+        Whether this kind of model is cached at all. Defaults to ``True``.
+    max_size: Optional[:class:`int`]
+        The maximum number of models to keep. ``None`` means unbounded.
+    ttl: Optional[:class:`float`]
+        The number of seconds a model may go unaccessed before it expires.
+        ``None`` means never.
+    max_per_group: Optional[:class:`int`]
+        The maximum number of models to keep per channel (for messages) or
+        per team (for members, channels and threads). ``None`` means no
+        limit.
+    """
+    def __init__(self, enabled=True, *, max_size=None, ttl=None, max_per_group=None):
+        self.enabled = enabled
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_per_group = max_per_group
+
+    def __repr__(self):
+        return f'<CacheRule enabled={self.enabled} max_size={self.max_size!r} ttl={self.ttl!r} max_per_group={self.max_per_group!r}>'
+
+    @classmethod
+    def from_value(cls, value):
+        """Build a rule from the shorthand accepted by :class:`CachePolicy`:
+        a :class:`bool` enables or disables the cache, an :class:`int` bounds
+        its size, and ``None`` disables it."""
+        if isinstance(value, cls):
+            return value
+        if value is None or value is False:
+            return cls(enabled=False)
+        if value is True:
+            return cls()
+        if isinstance(value, int):
+            return cls(max_size=value)
+        raise TypeError(f'Expected a bool, int, or CacheRule, not {value.__class__.__name__}')
+
+
+class CachePolicy:
+    """Controls which models a :class:`Client` caches, and how many.
+
+    Each keyword argument accepts a :class:`bool` (cache everything or
+    nothing), an :class:`int` (cache at most that many, least recently used
+    first out), or a :class:`CacheRule` for size, per-group and time limits.
+    Everything that is not cached is fetched from the API when needed by the
+    ``getch_*`` methods.
+
+    Example
+    ---------
+
+    .. code-block:: python3
+
+        # a stateless relay: only keep channels around
+        policy = guilded.CachePolicy.none()
+        policy.channels = guilded.CacheRule()
+        client = guilded.Client(cache_policy=policy)
+
+    Parameters
+    ------------
+    messages: Union[:class:`bool`, :class:`int`, :class:`CacheRule`]
+        Defaults to ``1000``.
+    members: Union[:class:`bool`, :class:`int`, :class:`CacheRule`]
+    channels: Union[:class:`bool`, :class:`int`, :class:`CacheRule`]
+    users: Union[:class:`bool`, :class:`int`, :class:`CacheRule`]
+    dm_channels: Union[:class:`bool`, :class:`int`, :class:`CacheRule`]
+    threads: Union[:class:`bool`, :class:`int`, :class:`CacheRule`]
+    """
+    KINDS = ('messages', 'members', 'channels', 'users', 'dm_channels', 'threads')
+
+    def __init__(self, *, messages=1000, members=True, channels=True, users=True, dm_channels=True, threads=True):
+        self.messages = messages
+        self.members = members
+        self.channels = channels
+        self.users = users
+        self.dm_channels = dm_channels
+        self.threads = threads
+
+    def __setattr__(self, name, value):
+        if name in self.KINDS:
+            value = CacheRule.from_value(value)
+        super().__setattr__(name, value)
+
+    def __repr__(self):
+        return '<CachePolicy {}>'.format(' '.join(f'{kind}={getattr(self, kind)!r}' for kind in self.KINDS))
+
+    @classmethod
+    def all(cls):
+        """A policy that caches everything without limits."""
+        return cls(messages=True)
+
+    @classmethod
+    def none(cls):
+        """A policy that caches nothing."""
+        return cls(**{kind: False for kind in cls.KINDS})
+
+    def caches(self, kind):
+        """Whether a kind of model (such as ``'messages'``) is cached."""
+        return getattr(self, kind).enabled
+
+    def build(self, kind, *, key=attrgetter('id'), group=None):
+        """Create the cache for a kind of model. A cache is created even if
+        the kind is disabled, it is just never added to."""
+        rule = getattr(self, kind)
+        if kind == 'messages':
+            return MessageCache(rule.max_size, max_messages_per_channel=rule.max_per_group, ttl=rule.ttl)
+        return LRUCache(rule.max_size, max_per_group=rule.max_per_group, ttl=rule.ttl, key=key, group=group)
+
+
+class UploadCache:
+    """Remembers the CDN URLs of uploaded files by their content, so that
+    uploading the same content again can be skipped.
+
+    Entries are keyed by a SHA-256 hash of the file's content and the
+    :class:`MediaType` it was uploaded as.
+
+    Example
+    ---------
+
+    .. code-block:: python3
+
+        client = guilded.Client(upload_cache=guilded.UploadCache(1000, path='uploads.db'))
+
+    Parameters
+    ------------
+    max_size: Optional[:class:`int`]
+        The maximum number of URLs to keep in memory, least recently used
+        first out. ``None`` means unbounded. Defaults to ``1000``.
+    ttl: Optional[:class:`float`]
+        The number of seconds a URL may be reused for after it was uploaded,
+        both in memory and on disk. ``None`` means forever.
+    path: Optional[:class:`str`]
+        A file to also keep URLs in, so that they persist between runs. It is
+        created if it does not exist.
+
+    Attributes
+    ------------
+    hits: :class:`int`
+        The number of uploads that were skipped.
+    misses: :class:`int`
+        The number of uploads that were not.
+    """
+    def __init__(self, max_size=1000, *, ttl=None, path=None):
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+        # expiry is by upload time rather than by access, so it is checked
+        # here rather than by the LRU cache
+        self._urls = LRUCache(max_size, key=itemgetter(0))
+        self._store = dbm.open(path, 'c') if path is not None else None
+
+    def __repr__(self):
+        return f'<UploadCache size={len(self._urls)} hits={self.hits} misses={self.misses} path={self.path!r}>'
+
+    @staticmethod
+    def key(digest, media_type):
+        return f'{media_type}:{digest}'
+
+    def _fresh(self, uploaded_at):
+        return self.ttl is None or time.time() - uploaded_at <= self.ttl
+
+    def get(self, key):
+        """Get the URL for a key, or ``None`` if there is no fresh one."""
+        entry = self._urls.get(key)
+        if entry is None and self._store is not None:
+            try:
+                stored = utils._from_json(self._store[key])
+            except KeyError:
+                pass
+            else:
+                entry = (key, stored['url'], stored['uploadedAt'])
+                self._urls.add(entry)
+
+        if entry is not None and self._fresh(entry[2]):
+            self.hits += 1
+            return entry[1]
+
+        if entry is not None:
+            self.remove(key)
+        self.misses += 1
+        return None
+
+    def add(self, key, url):
+        """Remember the URL for a key."""
+        uploaded_at = time.time()
+        self._urls.add((key, url, uploaded_at))
+        if self._store is not None:
+            self._store[key] = utils._to_json({'url': url, 'uploadedAt': uploaded_at})
+
+    def remove(self, key):
+        """Forget the URL for a key."""
+        self._urls.remove(key)
+        if self._store is not None:
+            try:
+                del self._store[key]
+            except KeyError:
+                pass
+
+    def close(self):
+        """Close the on-disk store, if there is one."""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
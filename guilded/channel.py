@@ -54,7 +54,7 @@ from enum import Enum
 import guilded.abc
 
 from .message import Message
-from .utils import ISO8601
+from .utils import lazy_timestamp
 
 
 class ChannelType(Enum):
@@ -72,6 +72,8 @@ class ChannelType(Enum):
         return getattr(self, string, None)
 
 class ChatChannel(guilded.abc.TeamChannel):
+    __slots__ = ()
+
     def __init__(self, **fields):
         super().__init__(**fields)
         self.type = ChannelType.chat
@@ -105,11 +107,20 @@ class ChatChannel(guilded.abc.TeamChannel):
         return thread
 
 class VoiceChannel(guilded.abc.TeamChannel):
+    __slots__ = ()
+
     def __init__(self, **fields):
         super().__init__(**fields)
         self.type = ChannelType.voice
 
 class Thread(guilded.abc.TeamChannel):
+    __slots__ = (
+        '_message_count',
+        'initial_message_id',
+        '_initial_message',
+        'participants',
+    )
+
     def __init__(self, **fields):
         super().__init__(**fields)
         data = fields.get('data') or fields.get('channel', {})
@@ -129,7 +140,7 @@ class Thread(guilded.abc.TeamChannel):
             member = self._state._get_team_member(self.team_id, member_obj.get('id'))
             if member is None:
                 # it's just an empty member with only ID, better than nothing?
-                member = self._state.create_member(member_obj)
+                member = self._state.create_member(data=member_obj, partial=True)
 
             self.participants.append(member)
 
@@ -182,6 +193,12 @@ class Thread(guilded.abc.TeamChannel):
         return message
 
 class DMChannel(guilded.abc.Messageable):
+    created_at = lazy_timestamp()
+    updated_at = lazy_timestamp()
+    deleted_at = lazy_timestamp()
+    archived_at = lazy_timestamp()
+    auto_archive_at = lazy_timestamp()
+
     def __init__(self, *, state, data):
         super().__init__(state=state, data=data)
         self.type = ChannelType.dm
@@ -195,11 +212,11 @@ class DMChannel(guilded.abc.Messageable):
                 if user.id != self._state.my_id:
                     self.recipient = user
 
-        self.created_at = ISO8601(data.get('createdAt'))
-        self.updated_at = ISO8601(data.get('updatedAt'))
-        self.deleted_at = ISO8601(data.get('deletedAt'))
-        self.archived_at = ISO8601(data.get('archivedAt'))
-        self.auto_archive_at = ISO8601(data.get('autoArchiveAt'))
+        self.created_at = data.get('createdAt')
+        self.updated_at = data.get('updatedAt')
+        self.deleted_at = data.get('deletedAt')
+        self.archived_at = data.get('archivedAt')
+        self.auto_archive_at = data.get('autoArchiveAt')
         self.voice_participants = data.get('voiceParticipants')
         self.last_message = None
         if data.get('lastMessage'):
@@ -51,19 +51,25 @@ DEALINGS IN THE SOFTWARE.
 
 import asyncio
 import logging
+import random
 import sys
+import time
 import traceback
+import zlib
 
 import aiohttp
 
-from .errors import NotFound, ClientException
+from .errors import ClientException
 from .embed import Embed
+from .cache import CachePolicy, CacheRule
+from .dispatch import EventScheduler
+from .enums import OverflowPolicy, SocketState
 from .gateway import GuildedWebSocket, WebSocketClosure
 from .http import HTTPClient
 from .presence import Presence
 from .status import Game
 from .team import Team
-from .user import ClientUser, User
+from .user import ClientUser
 
 log = logging.getLogger(__name__)
 
@@ -113,6 +119,19 @@ class Client:
     max_messages: Optional[:class:`int`]
         The maximum number of messages to store in the internal message cache.
         This defaults to ``1000``. Passing in ``None`` disables the message cache.
+    max_messages_per_channel: Optional[:class:`int`]
+        The maximum number of messages to store in the internal message cache
+        for any single channel. Defaults to ``None`` (no per-channel limit).
+    message_cache_ttl: Optional[:class:`float`]
+        The number of seconds a cached message may go unaccessed before it
+        expires from the internal message cache. Defaults to ``None`` (never).
+    cache_policy: Optional[:class:`CachePolicy`]
+        Which models to cache, and how many of each. When this is passed,
+        ``max_messages``, ``max_messages_per_channel`` and
+        ``message_cache_ttl`` are ignored. Use :meth:`CachePolicy.none` to
+        run without a cache, in which case the ``getch_*`` methods fetch
+        from the API. Defaults to caching everything except messages, which
+        are bounded by the above options.
     loop: Optional[:class:`asyncio.AbstractEventLoop`]
         The :class:`asyncio.AbstractEventLoop` to use for asynchronous operations.
         Defaults to ``None``, in which case the default event loop is used via
@@ -127,7 +146,74 @@ class Client:
     cache_on_startup: Optional[:class:`dict`]
         A mapping of types of objects to a :class:`bool` (whether to
         cache the type on startup). Currently accepts ``members`` and
-        ``channels``. By default, both are enabled.
+        ``channels``. By default, both are enabled unless they are disabled
+        by ``cache_policy``.
+    startup_concurrency: Optional[:class:`int`]
+        The maximum number of teams to cache members and channels for at
+        the same time while logging in. Defaults to ``10``.
+    defer_team_cache: Optional[:class:`bool`]
+        Whether to skip caching team members and channels while logging in
+        and instead cache them the first time each team is needed by an
+        event or by :meth:`.getch_team`. Defaults to ``False``. Either way,
+        teams that fail to cache while logging in are cached on next use.
+    max_concurrent_connections: Optional[:class:`int`]
+        The maximum number of team websockets to open at the same time while
+        connecting. Defaults to ``10``.
+    reconnect_delay: Optional[:class:`float`]
+        The base number of seconds to wait before reconnecting a dropped
+        websocket. Each failed attempt doubles this, up to
+        ``max_reconnect_delay``, with random jitter. Defaults to ``1``.
+    max_reconnect_delay: Optional[:class:`float`]
+        The most seconds to wait between reconnect attempts. Defaults to ``60``.
+    shard_id: Optional[:class:`int`]
+        The shard of teams this client should open websockets for. Must be
+        passed with ``shard_count``.
+    shard_count: Optional[:class:`int`]
+        The number of shards to spread team websockets across, for running
+        one client per process. Each team belongs to exactly one shard. The
+        global gateway is connected to by every shard.
+    request_hook: Optional[Callable[[:class:`RequestTrace`], Any]]
+        A function (or coroutine function) called with a
+        :class:`RequestTrace` after every HTTP request the library makes.
+        Records are also logged at the ``DEBUG`` level, and are not built
+        at all when neither is enabled.
+    event_concurrency: Optional[Union[:class:`int`, :class:`dict`]]
+        The maximum number of listeners that may run at once for each event.
+        Pass an :class:`int` to apply to every event, or a :class:`dict`
+        mapping event names (such as ``message``) to limits, where the
+        ``None`` key is the default. Defaults to no limit.
+    event_queue_size: Optional[:class:`int`]
+        The maximum number of listener calls to queue per event once its
+        concurrency limit is reached. Defaults to ``None`` (unbounded).
+    event_overflow: Optional[:class:`OverflowPolicy`]
+        What to do when an event's queue is full: hold further events
+        unparsed until there is room, drop the oldest queued call, or drop
+        the new one. Defaults to :attr:`OverflowPolicy.block`. Each socket
+        holds at most ``event_queue_size`` events, and then stops reading
+        until there is room. Heartbeat acknowledgements are not read while
+        it is stopped, so a queue that stays full for longer than the
+        gateway's ping timeout makes the socket reconnect. While events
+        are held, :meth:`wait_for` is not resolved either, so a listener
+        that waits for another event while it takes up a concurrency slot
+        can deadlock a full queue.
+    send_queue: Optional[:class:`bool`]
+        Whether to send messages through a queue per channel, which sends
+        them one at a time and merges bursts of plain text sends into a
+        single message. Each :meth:`abc.Messageable.send` call still returns
+        the message its content was sent in. Defaults to ``False``.
+    send_coalesce_window: Optional[:class:`float`]
+        How many seconds the send queue waits for more text to merge before
+        sending. Defaults to ``0.05``.
+    send_coalesce_limit: Optional[:class:`int`]
+        The most sends the send queue merges into one message. Defaults to
+        ``10``.
+    max_concurrent_uploads: Optional[:class:`int`]
+        The most files to upload at the same time when sending or editing a
+        message with several attachments. Defaults to ``4``.
+    upload_cache: Optional[:class:`UploadCache`]
+        A cache of uploaded file URLs by content. When given, uploading a
+        file whose content was already uploaded as the same media type
+        reuses the earlier URL instead. Defaults to ``None``.
 
     Attributes
     -----------
@@ -145,15 +231,59 @@ class Client:
         self.loop = options.pop('loop', asyncio.get_event_loop())
         self.user = None
         self.max_messages = options.pop('max_messages', 1000)
+        self.max_messages_per_channel = options.pop('max_messages_per_channel', None)
+        self.message_cache_ttl = options.pop('message_cache_ttl', None)
+        self.cache_policy = options.pop('cache_policy', None) or CachePolicy(
+            messages=CacheRule(
+                self.max_messages is not None,
+                max_size=self.max_messages,
+                max_per_group=self.max_messages_per_channel,
+                ttl=self.message_cache_ttl
+            )
+        )
         self.disable_team_websockets = options.pop('disable_team_websockets', False)
         self._login_presence = options.pop('presence', None)
         self._login_status = options.pop('status', None)
         self._listeners = {}
+        self.extra_events = {}
+        self._fanout = {}
+        self._waiters = {}
+        self.startup_concurrency = options.pop('startup_concurrency', 10)
+        self.defer_team_cache = options.pop('defer_team_cache', False)
+        # teams whose startup cache fill failed, filled again on next use
+        self._unfilled_teams = set()
+        self.max_concurrent_connections = options.pop('max_concurrent_connections', 10)
+        self.reconnect_delay = options.pop('reconnect_delay', 1)
+        self.max_reconnect_delay = options.pop('max_reconnect_delay', 60)
+        self.shard_id = options.pop('shard_id', None)
+        self.shard_count = options.pop('shard_count', None)
+        if (self.shard_id is None) != (self.shard_count is None):
+            raise TypeError('shard_id and shard_count must be passed together.')
+        if self.shard_count is not None and not 0 <= self.shard_id < self.shard_count:
+            raise ValueError('shard_id must be at least 0 and less than shard_count.')
+        self._socket_states = {}
+        self._request_hook = options.pop('request_hook', None)
+        self._send_queue_options = {
+            'send_queue': options.pop('send_queue', False),
+            'send_coalesce_window': options.pop('send_coalesce_window', 0.05),
+            'send_coalesce_limit': options.pop('send_coalesce_limit', 10),
+        }
+        self.max_concurrent_uploads = options.pop('max_concurrent_uploads', 4)
+        self.upload_cache = options.pop('upload_cache', None)
+        self._scheduler = EventScheduler(
+            self,
+            concurrency=options.pop('event_concurrency', None),
+            max_queue=options.pop('event_queue_size', None),
+            overflow=options.pop('event_overflow', OverflowPolicy.block)
+        )
+        # error reports for inline listeners, kept so they aren't garbage
+        # collected mid-run
+        self._error_tasks = set()
 
         cache_on_startup = options.pop('cache_on_startup', {})
         self.cache_on_startup = {
-            'members': cache_on_startup.get('members') or True,
-            'channels': cache_on_startup.get('channels') or True
+            'members': cache_on_startup.get('members', True) and self.cache_policy.caches('members'),
+            'channels': cache_on_startup.get('channels', True) and self.cache_policy.caches('channels')
         }
 
         # state
@@ -163,7 +293,26 @@ class Client:
 
     @property
     def cached_messages(self):
-        return list(self.http._messages.values())
+        return self.http._messages.values()
+
+    @property
+    def message_cache_stats(self):
+        """:class:`dict`: The hit, miss, and eviction counters of the internal
+        message cache, as well as its current size."""
+        return self.http._messages.stats
+
+    @property
+    def cache_stats(self):
+        """:class:`dict`: The :attr:`message_cache_stats` equivalent for every
+        kind of model in :attr:`cache_policy`, keyed by kind."""
+        return {
+            'messages': self.http._messages.stats,
+            'members': self.http._team_members.stats,
+            'channels': self.http._team_channels.stats,
+            'users': self.http._users.stats,
+            'dm_channels': self.http._dm_channels.stats,
+            'threads': self.http._threads.stats,
+        }
 
     @property
     def emojis(self):
@@ -175,16 +324,16 @@ class Client:
 
     @property
     def users(self):
-        return list(self.http._users.values())
+        return self.http._users.values()
 
     @property
     def members(self):
-        return list(self.http._team_members.values())
+        return self.http._team_members.values()
 
     @property
     def dm_channels(self):
         """List[:class:`.DMChannel`]: The private/dm channels that the connected client can see."""
-        return list(self.http._dm_channels.values())
+        return self.http._dm_channels.values()
 
     @property
     def private_channels(self):
@@ -197,7 +346,7 @@ class Client:
     @property
     def team_channels(self):
         """List[:class:`.TeamChannel`]: The team channels that the connected client can see."""
-        return list(self.http._team_channels.values())
+        return self.http._team_channels.values()
 
     @property
     def channels(self):
@@ -216,6 +365,14 @@ class Client:
     def latency(self):
         return float('nan') if self.ws is None else self.ws.latency
 
+    @property
+    def latencies(self):
+        """List[Tuple[Optional[:class:`str`], :class:`float`]]: The heartbeat
+        latency of every connected websocket, as ``(team_id, latency)``. The
+        global gateway has a ``team_id`` of ``None``."""
+        sockets = [(None, self.ws)] + [(team.id, team.ws) for team in self.teams]
+        return [(team_id, ws.latency) for team_id, ws in sockets if ws is not None]
+
     @property
     def closed(self):
         return self._closed
@@ -238,9 +395,7 @@ class Client:
                 pass
 
     def _schedule_event(self, coro, event_name, *args, **kwargs):
-        wrapped = self._run_event(coro, event_name, *args, **kwargs)
-        # Schedules the task
-        return asyncio.create_task(wrapped, name=f'guilded.py: {event_name}')
+        return self._scheduler.schedule(coro, event_name, *args, **kwargs)
 
     def event(self, coro):
         """A decorator to register an event for the library to automatically dispatch when appropriate.
@@ -266,13 +421,262 @@ class Client:
 
         setattr(self, coro.__name__, coro)
         self._listeners[coro.__name__] = coro
+        self._invalidate_listeners()
         return coro
 
-    def dispatch(self, event_name, *args, **kwargs):
-        coro = self._listeners.get(f'on_{event_name}')
-        if not coro:
+    def add_listener(self, func, name=None):
+        """Register a function to be called when an event is dispatched. Any
+        number of listeners may be registered for the same event.
+
+        Coroutine functions are scheduled as tasks. Regular functions are
+        called inline, directly from the gateway's reader, so they must be
+        fast and must not block.
+
+        Parameters
+        -----------
+        func: Callable
+            The function to call.
+        name: Optional[:class:`str`]
+            The name of the event to listen for, such as ``on_message``.
+            Defaults to the name of ``func``.
+        """
+        name = func.__name__ if name is None else name
+
+        if not callable(func):
+            raise TypeError('Listeners must be callable')
+
+        if name in self.extra_events:
+            self.extra_events[name].append(func)
+        else:
+            self.extra_events[name] = [func]
+        self._invalidate_listeners()
+
+    def remove_listener(self, func, name=None):
+        """Remove a listener registered with :meth:`.add_listener`."""
+        name = func.__name__ if name is None else name
+
+        if name in self.extra_events:
+            try:
+                self.extra_events[name].remove(func)
+            except ValueError:
+                pass
+        self._invalidate_listeners()
+
+    def listen(self, name=None):
+        """A decorator that registers a listener with :meth:`.add_listener`."""
+        def decorator(func):
+            self.add_listener(func, name)
+            return func
+
+        return decorator
+
+    def _invalidate_listeners(self):
+        self._fanout.clear()
+
+    def _get_fanout(self, method):
+        # (listener, whether it's a coroutine function) for every listener of
+        # this event, computed once per change to the registered listeners
+        try:
+            return self._fanout[method]
+        except KeyError:
+            pass
+
+        listeners = []
+        main = self._listeners.get(method)
+        if main is not None:
+            listeners.append(main)
+        listeners.extend(self.extra_events.get(method, ()))
+
+        fanout = tuple((func, asyncio.iscoroutinefunction(func)) for func in listeners)
+        self._fanout[method] = fanout
+        return fanout
+
+    def _has_listener(self, event_name):
+        return bool(self._get_fanout(f'on_{event_name}')) or bool(self._waiters.get(event_name))
+
+    def _add_waiter(self, event_name, check=None, *, channel_id=None, author_id=None):
+        # one-shot: the future is resolved (and removed) by the first
+        # dispatch of this event whose arguments pass the check. waiters are
+        # indexed by event, then by (channel_id, author_id), where None
+        # matches anything
+        future = self.loop.create_future()
+        if check is None:
+            def check(*args):
+                return True
+
+        index = self._waiters.get(event_name)
+        if index is None:
+            index = self._waiters[event_name] = {}
+        key = (channel_id, author_id)
+        waiters = index.get(key)
+        if waiters is None:
+            waiters = index[key] = []
+        waiters.append((future, check))
+        return future
+
+    def _remove_waiter(self, event_name, future, *, channel_id=None, author_id=None):
+        index = self._waiters.get(event_name)
+        if index is None:
+            return
+        key = (channel_id, author_id)
+        waiters = index.get(key)
+        if waiters is None:
             return
-        self.loop.create_task(coro(*args, **kwargs))
+
+        waiters[:] = [waiter for waiter in waiters if waiter[0] is not future]
+        if not waiters:
+            del index[key]
+            if not index:
+                del self._waiters[event_name]
+
+    def _resolve_waiters(self, event_name, args):
+        index = self._waiters[event_name]
+
+        keys = [(None, None)]
+        if args:
+            channel_id = getattr(args[0], 'channel_id', None)
+            author_id = getattr(args[0], 'author_id', None)
+            if channel_id is not None:
+                keys.append((channel_id, None))
+            if author_id is not None:
+                keys.append((None, author_id))
+            if channel_id is not None and author_id is not None:
+                keys.append((channel_id, author_id))
+
+        for key in keys:
+            waiters = index.get(key)
+            if not waiters:
+                continue
+
+            removed = []
+            for position, (future, condition) in enumerate(waiters):
+                if future.done():
+                    removed.append(position)
+                    continue
+
+                try:
+                    result = condition(*args)
+                except Exception as exc:
+                    future.set_exception(exc)
+                    removed.append(position)
+                else:
+                    if result:
+                        if len(args) == 0:
+                            future.set_result(None)
+                        elif len(args) == 1:
+                            future.set_result(args[0])
+                        else:
+                            future.set_result(args)
+                        removed.append(position)
+
+            if len(removed) == len(waiters):
+                del index[key]
+            else:
+                for position in reversed(removed):
+                    del waiters[position]
+
+        if not index:
+            del self._waiters[event_name]
+
+    async def wait_for(self, event, check=None, timeout=None, *, channel_id=None, author_id=None):
+        """|coro|
+
+        Wait for an event to be dispatched.
+
+        .. note::
+            With ``event_overflow`` set to :attr:`OverflowPolicy.block`,
+            events are not parsed while a dispatch queue is full, so waiting
+            from a listener of a limited event may never return until that
+            listener finishes.
+
+        Example
+        ---------
+
+        .. code-block:: python3
+
+            @client.event
+            async def on_message(message):
+                if message.content == '$greet':
+                    await message.channel.send('Say hello!')
+
+                    msg = await client.wait_for(
+                        'message',
+                        channel_id=message.channel_id,
+                        author_id=message.author_id,
+                        check=lambda m: m.content == 'hello'
+                    )
+                    await message.channel.send(f'Hello {msg.author}!')
+
+        Parameters
+        ------------
+        event: :class:`str`
+            The event name, without the ``on_`` prefix.
+        check: Optional[Callable[..., :class:`bool`]]
+            A predicate called with the event's arguments. The wait ends on
+            the first dispatch for which it returns ``True``.
+        timeout: Optional[:class:`float`]
+            The number of seconds to wait before raising
+            :exc:`asyncio.TimeoutError`. Defaults to ``None`` (forever).
+        channel_id: Optional[:class:`str`]
+            Only consider events whose first argument has this
+            ``channel_id``. Waiters are indexed by this value, so the check
+            is not called for events in other channels.
+        author_id: Optional[:class:`str`]
+            Only consider events whose first argument has this
+            ``author_id``. Indexed the same way as ``channel_id``.
+
+        Raises
+        --------
+        asyncio.TimeoutError
+            The timeout was reached.
+
+        Returns
+        --------
+        Any
+            Nothing, a single argument, or a tuple of the event's arguments,
+            depending on how many it was dispatched with.
+        """
+        future = self._add_waiter(event, check, channel_id=channel_id, author_id=author_id)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            # timed out or cancelled, so nothing else will remove it
+            if not future.done() or future.cancelled():
+                self._remove_waiter(event, future, channel_id=channel_id, author_id=author_id)
+
+    async def _report_inline_error(self, exc, event_name, *args, **kwargs):
+        try:
+            raise exc
+        except Exception:
+            await self.on_error(event_name, *args, **kwargs)
+
+    def dispatch(self, event_name, *args, **kwargs):
+        if event_name in self._waiters:
+            self._resolve_waiters(event_name, args)
+
+        method = f'on_{event_name}'
+        for func, is_coroutine in self._get_fanout(method):
+            if is_coroutine:
+                self._schedule_event(func, method, *args, **kwargs)
+            else:
+                try:
+                    func(*args, **kwargs)
+                except Exception as exc:
+                    task = asyncio.ensure_future(self._report_inline_error(exc, method, *args, **kwargs))
+                    self._error_tasks.add(task)
+                    task.add_done_callback(self._error_tasks.discard)
+
+    @property
+    def events_in_flight(self):
+        """:class:`dict`: The number of event listeners currently running,
+        keyed by listener name (such as ``on_message``)."""
+        return self._scheduler.in_flight
+
+    @property
+    def events_queued(self):
+        """:class:`dict`: The number of event listener calls waiting for a
+        concurrency slot, keyed by listener name."""
+        return self._scheduler.queued
 
     async def start(self, email, password, *, reconnect=True):
         """|coro|
@@ -283,30 +687,182 @@ class Client:
         await self.connect()
 
     async def login(self, email, password):
-        self.http = self.http or HTTPClient(session=aiohttp.ClientSession(loop=self.loop), max_messages=self.max_messages)
+        self.http = self.http or HTTPClient(
+            session=aiohttp.ClientSession(loop=self.loop),
+            cache_policy=self.cache_policy,
+            request_hook=self._request_hook,
+            max_concurrent_uploads=self.max_concurrent_uploads,
+            upload_cache=self.upload_cache,
+            **self._send_queue_options
+        )
         data = await self.http.login(email, password)
 
-        for team_data in data.get('teams'):
-            team = Team(state=self.http, data=team_data)
-
-            if self.cache_on_startup['members'] is True:
-                members = await team.fetch_members()
-                for member in members:
-                    self.http.add_to_member_cache(member)
+        teams = [Team(state=self.http, data=team_data) for team_data in data.get('teams')]
+        for team in teams:
+            self.http.add_to_team_cache(team)
 
-            if self.cache_on_startup['channels'] is True:
-                channels = await team.fetch_channels()
-                for channel in channels:
-                    if channel is None:
-                        continue
-                    self.http.add_to_team_channel_cache(channel)
+        if not self.defer_team_cache:
+            semaphore = asyncio.Semaphore(self.startup_concurrency)
+            completed = 0
 
-            self.http.add_to_team_cache(team)
+            async def warm_up(team):
+                nonlocal completed
+                async with semaphore:
+                    try:
+                        await self._fill_team_cache(team)
+                    except Exception as exc:
+                        # it will be retried the next time the team is needed
+                        self._unfilled_teams.add(team.id)
+                        log.warning('Failed to cache team %s on startup, retrying on next use: %s', team.id, exc)
+                completed += 1
+                self.dispatch('team_cache_progress', team, completed, len(teams))
+
+            start = time.perf_counter()
+            await asyncio.gather(*[warm_up(team) for team in teams])
+            log.info('Cached %s teams in %.2f seconds.', len(teams), time.perf_counter() - start)
 
         me = ClientUser(state=self.http, data=data)
         self.http.my_id = me.id
         self.user = me
 
+    def _fill_team_cache(self, team):
+        # shares one fill between everything that touches the team at once
+        if team._cache_task is None:
+            async def fill():
+                try:
+                    return await team.fill_cache(
+                        members=self.cache_on_startup['members'],
+                        channels=self.cache_on_startup['channels']
+                    )
+                except Exception:
+                    team._cache_task = None
+                    raise
+
+            team._cache_task = asyncio.ensure_future(fill())
+
+        return team._cache_task
+
+    @property
+    def team_cache_timings(self):
+        """:class:`dict`: A mapping of team IDs to the number of seconds their
+        members and channels took to cache, as returned by
+        :meth:`Team.fill_cache`."""
+        return {team.id: team.cache_timings for team in self.teams if team.cache_timings}
+
+    def _is_team_in_shard(self, team):
+        if self.shard_count is None:
+            return True
+        return zlib.crc32(str(team.id).encode()) % self.shard_count == self.shard_id
+
+    @property
+    def shard_teams(self):
+        """List[:class:`.Team`]: The teams whose websockets this client
+        connects to. This is every team unless ``shard_count`` is set."""
+        return [team for team in self.teams if self._is_team_in_shard(team)]
+
+    @property
+    def socket_states(self):
+        """:class:`dict`: A mapping of team IDs to the :class:`SocketState` of
+        that team's websocket. The global gateway is keyed by ``None``."""
+        return dict(self._socket_states)
+
+    async def _build_socket(self, team_id=None):
+        self._socket_states[team_id] = SocketState.connecting
+        gateway_args = {'teamId': team_id} if team_id is not None else {}
+        try:
+            ws = await asyncio.wait_for(GuildedWebSocket.build(self, loop=self.loop, **gateway_args), timeout=60)
+        except asyncio.TimeoutError:
+            log.warning('Timed out trying to connect%s.', f' to team {team_id}\'s websocket' if team_id else '')
+            ws = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # the socket is closed by build, and the caller backs off and retries
+            log.warning('Failed to connect%s: %r', f' to team {team_id}\'s websocket' if team_id else '', exc)
+            ws = None
+
+        if not isinstance(ws, GuildedWebSocket):
+            # build returns the handshake error instead of raising it
+            self._socket_states[team_id] = SocketState.reconnecting
+            return None
+
+        self._socket_states[team_id] = SocketState.connected
+        return ws
+
+    def _backoff_delay(self, attempt):
+        delay = min(self.max_reconnect_delay, self.reconnect_delay * 2 ** attempt)
+        # jitter so that many sockets dropped at once don't reconnect in lockstep
+        return random.uniform(delay / 2, delay)
+
+    async def _supervise_socket(self, ws, team=None):
+        team_id = team.id if team is not None else None
+        attempt = 0
+        while not self.closed:
+            if ws is None:
+                delay = self._backoff_delay(attempt)
+                if team_id:
+                    log.warning('Reconnecting to team %s\'s websocket in %.2f seconds', team_id, delay)
+                else:
+                    log.warning('Reconnecting to the gateway in %.2f seconds', delay)
+                self._socket_states[team_id] = SocketState.reconnecting
+                await asyncio.sleep(delay)
+                if self.closed:
+                    break
+
+                ws = await self._build_socket(team_id)
+                if ws is None:
+                    attempt += 1
+                    continue
+
+                attempt = 0
+                if team is not None:
+                    team.ws = ws
+                    self.dispatch('team_connect', team)
+                else:
+                    self.ws = ws
+                    self.http.ws = ws
+                    self.dispatch('connect')
+
+            try:
+                await ws.poll_event()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # any failure only takes down this socket, which is
+                # reconnected on its own
+                if not isinstance(exc, (WebSocketClosure, aiohttp.ClientError)):
+                    log.warning(
+                        'Dropping %s after an error',
+                        f'team {team_id}\'s websocket' if team_id else 'the gateway websocket',
+                        exc_info=exc
+                    )
+                    if ws._heartbeater is not None:
+                        ws._heartbeater.stop()
+                    if not ws.socket.closed:
+                        await ws.socket.close(code=4000)
+
+                code = ws._close_code or ws.socket.close_code
+                if team_id:
+                    log.warning('Team %s\'s websocket closed with code %s', team_id, code)
+                    self.dispatch('team_disconnect', team_id)
+                else:
+                    log.warning('Websocket closed with code %s', code)
+                    self.dispatch('disconnect')
+                ws = None
+
+        self._socket_states[team_id] = SocketState.closed
+
+    async def _connect_team_sockets(self, teams):
+        semaphore = asyncio.Semaphore(self.max_concurrent_connections)
+
+        async def connect_team(team):
+            async with semaphore:
+                team.ws = await self._build_socket(team.id)
+            if team.ws is not None:
+                self.dispatch('team_connect', team)
+
+        await asyncio.gather(*[connect_team(team) for team in teams])
+
     async def connect(self):
         if not self.http:
             raise ClientException('You must log in via REST before connecting to the gateway.')
@@ -320,6 +876,7 @@ class Client:
 
             self.ws = gws
             self.http.ws = self.ws
+            self._socket_states[None] = SocketState.connected
             self.dispatch('connect')
 
             if self._login_presence is not None:
@@ -330,53 +887,23 @@ class Client:
             # todo: start http ping thread
             # no need to do that if you don't want an online presence
 
-            if not self.disable_team_websockets:
-                for team in self.teams:
-                    team_ws_build = GuildedWebSocket.build(self, loop=self.loop, teamId=team.id)
-                    team_ws = await asyncio.wait_for(team_ws_build, timeout=60)
-                    if type(team_ws) == GuildedWebSocket:
-                        team.ws = team_ws
-                        self.dispatch('team_connect', team)
-
-            async def listen_socks(ws, team=None):
-                teamId = team.id if team is not None else None
-                next_backoff_time = 5
-                while True and ws is not None:
-                    try:
-                        await ws.poll_event()
-                    except WebSocketClosure as exc:
-                        code = ws._close_code or ws.socket.close_code
-                        if teamId:
-                            log.warning('Team %s\'s websocket closed with code %s, attempting to reconnect in %s seconds', teamId, code, next_backoff_time)
-                            self.dispatch('team_disconnect', teamId)
-                        else:
-                            log.warning('Websocket closed with code %s, attempting to reconnect in %s seconds', code, next_backoff_time)
-                            self.dispatch('disconnect')
-                        await asyncio.sleep(next_backoff_time)
-                        if teamId:
-                            build = GuildedWebSocket.build(self, loop=self.loop, teamId=teamId)
-                        else:
-                            # possible reconnect issues brought up by @8r2y5
-                            build = GuildedWebSocket.build(self, loop=self.loop)
-                        try:
-                            ws = await asyncio.wait_for(build, timeout=60)
-                        except asyncio.TimeoutError:
-                            log.warning('Timed out trying to reconnect.')
-                            next_backoff_time += 5
-                    else:
-                        next_backoff_time = 5
+            teams = [] if self.disable_team_websockets else self.shard_teams
+            await self._connect_team_sockets(teams)
 
             self._ready.set()
             self.dispatch('ready')
 
             await asyncio.gather(
-                listen_socks(self.ws), *[listen_socks(team.ws, team) for team in self.teams]
+                self._supervise_socket(self.ws), *[self._supervise_socket(team.ws, team) for team in teams]
             )
 
     async def close(self):
         """|coro|"""
         if self._closed: return
 
+        self._closed = True
+        if self.http._send_queue is not None:
+            self.http._send_queue.close()
         await self.http.logout()
         for ws in [self.ws] + [team.ws for team in self.teams if team.ws is not None]:
             try:
@@ -385,8 +912,9 @@ class Client:
                 # it's probably already closed, but catch all anyway
                 pass
 
-        self._closed = True
         self._ready.clear()
+        for team_id in self._socket_states:
+            self._socket_states[team_id] = SocketState.closed
 
     def run(self, email: str, password: str):
         """Login and connect to Guilded, and start the event loop. This is a
@@ -569,7 +1097,20 @@ class Client:
         :class:`Team`
             The team from the ID
         """
-        return self.get_team(id) or await self.fetch_team(id)
+        team = self.get_team(id)
+        if team is None:
+            return await self.fetch_team(id)
+
+        if self.defer_team_cache or team.id in self._unfilled_teams:
+            try:
+                await self._fill_team_cache(team)
+            except Exception as exc:
+                # the team itself is still usable; its cache is filled later
+                self._unfilled_teams.add(team.id)
+                log.warning('Failed to cache team %s, retrying on next use: %s', team.id, exc)
+            else:
+                self._unfilled_teams.discard(team.id)
+        return team
 
     async def fetch_user(self, id: str):
         """|coro|
@@ -582,7 +1123,7 @@ class Client:
             The user from the ID
         """
         user = await self.http.get_user(id)
-        return User(state=self.http, data=user)
+        return self.http.create_user(data=user)
 
     async def getch_user(self, id: str):
         """|coro|
@@ -607,14 +1148,30 @@ class Client:
             The channel from the ID
         """
         channel = self.get_channel(id)
-        if team_id is None and channel is None:
-            raise NotFound(id)
-        elif team_id is not None and channel is None:
-            team = await self.getch_team(team_id)
-            channel = team.get_channel(id) or await team.fetch_channel(id)
+        if channel is None:
+            if team_id is not None:
+                team = await self.getch_team(team_id)
+                channel = team.get_channel(id) or await team.fetch_channel(id)
+            else:
+                channel = await self.fetch_channel(id)
 
         return channel
 
+    async def fetch_channel(self, id: str):
+        """|coro|
+
+        Fetch a channel from the API.
+
+        Returns
+        ---------
+        Union[:class:`TeamChannel`, :class:`DMChannel`]
+            The channel from the ID
+        """
+        data = await self.http.get_channel(id)
+        channel_data = data['metadata']['channel']
+        team = self.get_team(channel_data.get('teamId'))
+        return self.http.create_channel(data=channel_data, team=team)
+
     async def fetch_game(self, id: int):
         """|coro|
 
@@ -669,7 +1226,7 @@ class Client:
         settings = await self.http.get_privacy_settings()
         blocked = []
         for user in settings.get('blockedUsers', []):
-            blocked.append(User(state=self.http, data=user))
+            blocked.append(self.http.create_user(data=user))
 
         return blocked
 
@@ -0,0 +1,179 @@
+"""
+MIT License
+
+Copyright (c) 2020-present shay (shayypy)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+------------------------------------------------------------------------------
+
+This project includes code from https://github.com/Rapptz/discord.py, which is
+available under the MIT license:
+
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+from collections import deque
+import logging
+
+from .enums import OverflowPolicy
+
+log = logging.getLogger(__name__)
+
+
+class EventScheduler:
+    """Runs event listeners as tasks, limiting how many listeners for each
+    event may run at once and queueing the rest.
+
+    Parameters
+    ------------
+    client: :class:`Client`
+        The client whose :meth:`Client._run_event` wraps each listener, so
+        that exceptions are always routed to ``on_error``.
+    concurrency: Optional[Union[:class:`int`, :class:`dict`]]
+        The maximum number of listeners that may run at once per event. An
+        :class:`int` applies to every event; a :class:`dict` maps event names
+        (such as ``message``) to limits, with the ``None`` key as the default.
+        Events without a limit are never queued.
+    max_queue: Optional[:class:`int`]
+        The maximum number of listener calls to queue per event once its
+        concurrency limit is reached. ``None`` means unbounded.
+    overflow: :class:`OverflowPolicy`
+        What to do when an event's queue is full.
+    """
+    def __init__(self, client, *, concurrency=None, max_queue=None, overflow=OverflowPolicy.block):
+        self.client = client
+        if isinstance(concurrency, dict):
+            self._default_limit = concurrency.get(None)
+            self._limits = {f'on_{name}': limit for name, limit in concurrency.items() if name is not None}
+        else:
+            self._default_limit = concurrency
+            self._limits = {}
+        self.max_queue = max_queue
+        self.overflow = OverflowPolicy(overflow)
+
+        self._in_flight = {}
+        self._queues = {}
+        self._full = set()
+        self._tasks = set()
+        self.dropped = 0
+
+        self._has_capacity = asyncio.Event()
+        self._has_capacity.set()
+
+    @property
+    def in_flight(self):
+        """:class:`dict`: The number of listeners currently running, per event."""
+        return {name: count for name, count in self._in_flight.items() if count}
+
+    @property
+    def queued(self):
+        """:class:`dict`: The number of listener calls waiting to run, per event."""
+        return {name: len(queue) for name, queue in self._queues.items() if queue}
+
+    def _limit(self, event_name):
+        return self._limits.get(event_name, self._default_limit)
+
+    def schedule(self, coro, event_name, *args, **kwargs):
+        limit = self._limit(event_name)
+        if limit is None or self._in_flight.get(event_name, 0) < limit:
+            self._start(coro, event_name, args, kwargs)
+            return
+
+        queue = self._queues.get(event_name)
+        if queue is None:
+            queue = self._queues[event_name] = deque()
+
+        if self.max_queue is not None and len(queue) >= self.max_queue:
+            if self.overflow is OverflowPolicy.drop_newest:
+                self.dropped += 1
+                log.debug('Dropped %s: its queue is full.', event_name)
+                return
+            elif self.overflow is OverflowPolicy.drop_oldest:
+                queue.popleft()
+                self.dropped += 1
+                log.debug('Dropped the oldest queued %s: its queue is full.', event_name)
+
+        queue.append((coro, args, kwargs))
+        if (
+            self.overflow is OverflowPolicy.block
+            and self.max_queue is not None
+            and len(queue) >= self.max_queue
+        ):
+            self._full.add(event_name)
+            self._has_capacity.clear()
+
+    def _start(self, coro, event_name, args, kwargs):
+        self._in_flight[event_name] = self._in_flight.get(event_name, 0) + 1
+        task = asyncio.ensure_future(self._run(coro, event_name, args, kwargs))
+        # keep a reference so the task isn't garbage collected mid-run
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, coro, event_name, args, kwargs):
+        try:
+            await self.client._run_event(coro, event_name, *args, **kwargs)
+        finally:
+            self._in_flight[event_name] -= 1
+            queue = self._queues.get(event_name)
+            if queue:
+                next_coro, next_args, next_kwargs = queue.popleft()
+                self._start(next_coro, event_name, next_args, next_kwargs)
+
+            if event_name in self._full and (self.max_queue is None or len(queue or ()) < self.max_queue):
+                self._full.discard(event_name)
+                if not self._full:
+                    self._has_capacity.set()
+
+    @property
+    def has_capacity(self):
+        """:class:`bool`: Whether no event queue is full."""
+        return self._has_capacity.is_set()
+
+    async def wait_for_capacity(self):
+        """|coro|
+
+        Wait until no event queue is full. While a queue is full under
+        :attr:`OverflowPolicy.block`, the gateway holds incoming events
+        without parsing them until this returns, and stops reading once it
+        holds ``max_queue`` of them.
+        """
+        if not self._has_capacity.is_set():
+            await self._has_capacity.wait()
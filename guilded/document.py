@@ -0,0 +1,170 @@
+"""
+MIT License
+
+Copyright (c) 2020-present shay (shayypy)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+------------------------------------------------------------------------------
+
+This project includes code from https://github.com/Rapptz/discord.py, which is
+available under the MIT license:
+
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+# Guilded sends message content, captions and other rich text as a tree of
+# document nodes. These helpers render that tree into markdown in a single
+# pass, appending pieces to one list and joining it once at the end.
+
+# mark type -> the markdown that wraps text with that mark
+MARKS = {
+    'bold': '**',
+    'italic': '*',
+    'underline': '__',
+    'strikethrough': '~~',
+    'spoiler': '||',
+}
+
+
+def _write_leaves(leaves, write):
+    for leaf in leaves:
+        text = str(leaf['text'])
+        marks = leaf.get('marks')
+        if not marks:
+            write(text)
+            continue
+
+        # the first mark is innermost, matching how the client nests them
+        wrappers = [MARKS[mark['type']] for mark in marks if mark['type'] in MARKS]
+        write(''.join(reversed(wrappers)))
+        write(text)
+        write(''.join(wrappers))
+
+
+def _write_inline(element, write):
+    element_type = element['type']
+    if element_type == 'mention':
+        mentioned = element['data']['mention']
+        if mentioned['type'] in ('role', 'person'):
+            write(f'<@{mentioned["id"]}>')
+
+    elif element_type == 'reaction':
+        write(str(element['nodes'][0]['leaves'][0]['text']))
+
+    elif element_type == 'link':
+        text = element['nodes'][0]['leaves'][0]['text']
+        href = element['data']['href']
+        if href != text:
+            write(f'[{text}]({href})')
+        else:
+            write(href)
+
+    elif element_type == 'channel':
+        write(f'<#{element["data"]["channel"].get("id")}>')
+
+
+def _write_paragraph(node, write):
+    for element in node['nodes']:
+        obj = element['object']
+        if obj == 'text':
+            _write_leaves(element['leaves'], write)
+        elif obj == 'inline':
+            _write_inline(element, write)
+    write('\n')
+
+
+def _write_plain_text(node, write):
+    write(node['nodes'][0]['leaves'][0]['text'])
+
+
+def _write_block_quote(node, write):
+    write(f'\n> {node["nodes"][0]["nodes"][0]["leaves"][0]["text"]}\n')
+
+
+# node type -> writer. node types that have no text representation (such as
+# images and webhook embeds) are skipped
+NODE_WRITERS = {
+    'paragraph': _write_paragraph,
+    'markdown-plain-text': _write_plain_text,
+    'block-quote-container': _write_block_quote,
+}
+
+
+def render_leaves(leaves):
+    """Render a list of text leaves, such as an image caption line, into
+    markdown.
+
+    Parameters
+    ------------
+    leaves: List[:class:`dict`]
+        The leaves to render.
+
+    Returns
+    ---------
+    :class:`str`
+    """
+    buffer = []
+    _write_leaves(leaves, buffer.append)
+    return ''.join(buffer)
+
+
+def render_nodes(nodes):
+    """Render a list of top-level document nodes into markdown.
+
+    Trailing newlines are stripped, in case the last paragraph was not
+    followed by another.
+
+    Parameters
+    ------------
+    nodes: List[:class:`dict`]
+        The document's nodes.
+
+    Returns
+    ---------
+    :class:`str`
+    """
+    buffer = []
+    write = buffer.append
+    for node in nodes:
+        writer = NODE_WRITERS.get(node['type'])
+        if writer is not None:
+            writer(node, write)
+    return ''.join(buffer).rstrip('\n')
@@ -68,3 +68,22 @@ class AllowFriendRequestsFrom(Enum):
 
     def __str__(self):
         return self.value
+
+class SocketState(Enum):
+    """The connection state of a gateway websocket."""
+    connecting = 'connecting'
+    connected = 'connected'
+    reconnecting = 'reconnecting'
+    closed = 'closed'
+
+    def __str__(self):
+        return self.value
+
+class OverflowPolicy(Enum):
+    """What to do with a new event when its dispatch queue is full."""
+    block = 'block'
+    drop_oldest = 'drop_oldest'
+    drop_newest = 'drop_newest'
+
+    def __str__(self):
+        return self.value
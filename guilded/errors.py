@@ -56,6 +56,23 @@ class GuildedException(Exception):
 class ClientException(GuildedException):
     pass
 
+class MediaTooLarge(ClientException):
+    """Thrown when media being downloaded is larger than the ``max_size``
+    it was downloaded with.
+
+    Attributes
+    -----------
+    size: :class:`int`
+        The size of the media, or the number of bytes received before the
+        download was stopped if the size was not known up front.
+    max_size: :class:`int`
+        The largest size that was allowed.
+    """
+    def __init__(self, size, max_size):
+        self.size = size
+        self.max_size = max_size
+        super().__init__(f'Media is larger than the maximum of {max_size} bytes (got {size}).')
+
 class HTTPException(GuildedException):
     """A non-ok response from Guilded was returned whilst performing an HTTP request.
 
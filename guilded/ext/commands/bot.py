@@ -125,6 +125,7 @@ class Bot(guilded.Client):
 
         self._listeners = {'on_message': self.on_message, 'on_command_error': self.on_command_error}
         self.extra_events = {}
+        self._invalidate_listeners()
 
         if options.pop('self_bot', False):
             self._skip_check = lambda x, y: x != y
@@ -146,12 +147,6 @@ class Bot(guilded.Client):
     def all_commands(self):
         return {**self._commands, **self._commands_by_alias}
 
-    def dispatch(self, event_name, *args, **kwargs):
-        super().dispatch(event_name, *args, **kwargs)
-        ev = 'on_' + event_name
-        for event in self.extra_events.get(ev, []):
-            self._schedule_event(event, ev, *args, **kwargs)
-
     def add_command(self, command):
         if command.name in self._commands.keys():
             raise errors.CommandRegistrationError(f'A command with the name {command.name} is already registered.')
@@ -218,35 +213,6 @@ class Bot(guilded.Client):
         print(f'Ignoring exception in command {context.command}:', file=sys.stderr)
         traceback.print_exception(type(exception), exception, exception.__traceback__, file=sys.stderr)
 
-    # listeners
-
-    def add_listener(self, func, name=None):
-        name = func.__name__ if name is None else name
-
-        if not asyncio.iscoroutinefunction(func):
-            raise TypeError('Listeners must be coroutines')
-
-        if name in self.extra_events:
-            self.extra_events[name].append(func)
-        else:
-            self.extra_events[name] = [func]
-
-    def remove_listener(self, func, name=None):
-        name = func.__name__ if name is None else name
-
-        if name in self.extra_events:
-            try:
-                self.extra_events[name].remove(func)
-            except ValueError:
-                pass
-
-    def listen(self, name=None):
-        def decorator(func):
-            self.add_listener(func, name)
-            return func
-
-        return decorator
-
     async def is_owner(self, user: guilded.User):
         """|coro|
 
@@ -500,6 +466,8 @@ class Bot(guilded.Client):
             for index in reversed(remove):
                 del event_list[index]
 
+        self._invalidate_listeners()
+
     def _call_module_finalizers(self, lib: types.ModuleType, key: str) -> None:
         try:
             func = getattr(lib, 'teardown')
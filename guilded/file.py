@@ -49,11 +49,20 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 
+import asyncio
+import hashlib
 import io
+import os
+import time
 from enum import Enum
 from typing import Union
 
+import aiohttp
+
 from . import utils
+from .asset import AssetMixin
+from .document import render_leaves
+from .errors import ClientException
 
 
 class MediaType(Enum):
@@ -97,17 +106,64 @@ class FileType(Enum):
     def __repr__(self):
         return f'<FileType name={self.name} value={self.value}>'
 
+class _FilePayload(aiohttp.Payload):
+    # streams a File into a multipart request one chunk at a time, so that
+    # only a chunk of each file is ever held in memory
+    def __init__(self, file):
+        super().__init__(file, content_type='application/octet-stream', filename=file._upload_filename)
+        self._size = file.size
+
+    async def write(self, writer):
+        file = self._value
+        loop = asyncio.get_event_loop()
+        fp, opened = file._open()
+        try:
+            # reading from disk could block the event loop
+            blocking = not isinstance(fp, io.BytesIO)
+            sent = 0
+            while True:
+                if blocking:
+                    chunk = await loop.run_in_executor(None, fp.read, file.CHUNK_SIZE)
+                else:
+                    chunk = fp.read(file.CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                await writer.write(chunk)
+                sent += len(chunk)
+                if file.on_progress is not None:
+                    file.on_progress(file, sent, self._size)
+        finally:
+            if opened:
+                fp.close()
+
+    def decode(self, encoding='utf-8', errors='strict'):
+        return bytes(self._value).decode(encoding, errors)
+
 class File:
-    def __init__(self, fp: Union[str, io.BufferedIOBase], *, filename=None, file_type: FileType = None):
+    CHUNK_SIZE = 256 * 1024
+
+    def __init__(self, fp: Union[str, bytes, io.IOBase], *, filename=None, file_type: FileType = None, on_progress=None):
         """Wraps media pre-and-mid-upload.
 
+        Files are streamed from their source when they are uploaded rather
+        than read into memory up front. A file given by path is only opened
+        while it is being uploaded, and is always closed afterwards. File
+        objects passed in are read from their current position and are left
+        open for their owner to close.
+
+        Streams that cannot seek, such as pipes and sockets, are read once,
+        front to back. Their size is not known in advance, their upload
+        cannot be retried, and they are never looked up in or added to an
+        :class:`UploadCache`, since hashing them would consume them.
+
         .. warning::
 
             Non-image/video filetypes are not supported by Guilded.
 
         Parameters
         ------------
-        fp: Union[:class:`str`, :class:`io.BufferedIOBase`]
+        fp: Union[:class:`str`, :class:`bytes`, :class:`io.IOBase`]
             The file to upload. If passing a file with ``open``, the file
             should be opened in ``rb`` mode.
         filename: Optional[:class:`str`]
@@ -116,10 +172,14 @@ class File:
         file_type: :class:`FileType`
             The type of file (image, video). It this could not be detected by
             the library, defaults to :attr:`FileType.image`. 
+        on_progress: Optional[Callable[[:class:`File`, :class:`int`, :class:`int`], Any]]
+            A function called as each chunk of this file is uploaded, with
+            the file, the number of bytes sent so far and the total size,
+            which is ``None`` for streams that cannot seek.
 
         Attributes
         ------------
-        fp: Union[:class:`str`, :class:`io.BufferedIOBase`]
+        fp: Union[:class:`str`, :class:`bytes`, :class:`io.IOBase`]
             The file to upload.
         filename: Optional[:class:`str`]
             The name of this file.
@@ -130,14 +190,19 @@ class File:
         url: Optional[:class:`str`]
             The URL to the file on Guilded's CDN after being uploaded by the
             library.
+        upload_time: Optional[:class:`float`]
+            How many seconds the upload took, once this file has been
+            uploaded by the library.
         """
         self.fp = fp
         self.type = None
         self.url = None
+        self.upload_time = None
         self.filename = filename
+        self._streamed = False
+        self.on_progress = on_progress
 
         if type(fp) == str:
-            self._bytes = open(fp, 'rb')
             self.filename = filename or fp
             if file_type is None:
                 try:
@@ -159,11 +224,9 @@ class File:
         else:
             if isinstance(fp, io.BytesIO):
                 fp.seek(0)
-                self._bytes = fp.read()
-            elif isinstance(fp, (bytes, io.BufferedReader)):
-                self._bytes = fp
-            else:
-                self._bytes = None
+            seekable = getattr(fp, 'seekable', None)
+            # streams that cannot seek are read once from wherever they are
+            self._position = fp.tell() if seekable is not None and seekable() else None
             self.file_type = file_type
 
         if self.file_type is None:
@@ -174,7 +237,47 @@ class File:
         return f'<File type={self.type}>'
 
     def __bytes__(self):
-        return self._bytes
+        fp, opened = self._open()
+        try:
+            return fp.read()
+        finally:
+            if opened:
+                fp.close()
+
+    @property
+    def _rereadable(self):
+        return isinstance(self.fp, (str, bytes, bytearray, memoryview)) or self._position is not None
+
+    @property
+    def _upload_filename(self):
+        return os.path.basename(self.filename) if self.filename else 'file'
+
+    @property
+    def size(self):
+        """Optional[:class:`int`]: The number of bytes that will be uploaded,
+        or ``None`` if the file is a stream that cannot seek."""
+        if isinstance(self.fp, str):
+            return os.path.getsize(self.fp)
+        if isinstance(self.fp, (bytes, bytearray, memoryview)):
+            return len(self.fp)
+        if self._position is None:
+            return None
+
+        end = self.fp.seek(0, io.SEEK_END)
+        self.fp.seek(self._position)
+        return end - self._position
+
+    def _open(self):
+        # returns a readable binary file positioned at the start of the
+        # content, and whether it was opened here (and so must be closed)
+        if isinstance(self.fp, str):
+            return open(self.fp, 'rb'), True
+        if isinstance(self.fp, (bytes, bytearray, memoryview)):
+            return io.BytesIO(self.fp), True
+
+        if self._position is not None:
+            self.fp.seek(self._position)
+        return self.fp, False
 
     def set_media_type(self, media_type):
         """Manually set this file's media type."""
@@ -186,13 +289,52 @@ class File:
         self.file_type = file_type
         return self
 
+    def _form(self):
+        # a new form is needed for each attempt, because a streamed form can
+        # only be sent once
+        if not self._rereadable:
+            if self._streamed:
+                raise ClientException('This file is a stream that cannot seek, so its upload cannot be retried.')
+            self._streamed = True
+        form = aiohttp.FormData()
+        form.add_field('file', _FilePayload(self), filename=self._upload_filename, content_type='application/octet-stream')
+        return form
+
+    def _hash(self):
+        fp, opened = self._open()
+        try:
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: fp.read(self.CHUNK_SIZE), b''):
+                digest.update(chunk)
+            return digest.hexdigest()
+        finally:
+            if opened:
+                fp.close()
+
     async def _upload(self, state):
+        start = time.perf_counter()
+        cache = state._upload_cache if self._rereadable else None
+        if cache is not None:
+            if isinstance(self.fp, (str, io.BufferedIOBase)) and not isinstance(self.fp, io.BytesIO):
+                digest = await asyncio.get_event_loop().run_in_executor(None, self._hash)
+            else:
+                digest = self._hash()
+            key = cache.key(digest, self.type)
+            url = cache.get(key)
+            if url is not None:
+                self.url = url
+                self.upload_time = time.perf_counter() - start
+                return self
+
         response = await state.upload_file(self)
+        self.upload_time = time.perf_counter() - start
         url = response.get('url')
         self.url = url
+        if cache is not None and url is not None:
+            cache.add(key, url)
         return self
 
-class Attachment:
+class Attachment(AssetMixin):
     """An uploaded attachment in a message, announcement, document, or any
     other place you can upload files inline with content.
 
@@ -216,35 +358,20 @@ class Attachment:
         self.file_type = getattr(FileType, data.get('type'), None)
         self.type = extra.get('type') or MediaType.attachment
         self.url = data.get('data', {}).get('src')
+        self._node = data
+
+        self._caption_leaves = None
+        self._caption = None
         if data.get('nodes'):
             node = data['nodes'][0] or {}
             if node.get('type') == 'image-caption-line':
-                caption = ''
-                for leaf in node.get('leaves', []):
-                    if not leaf.get('marks'):
-                        caption += leaf['text']
-                    else:
-                        to_mark = '{unmarked_content}'
-                        for mark in leaf['marks']:
-                            if mark['type'] == 'bold':
-                                to_mark = '**' + to_mark + '**'
-                            elif mark['type'] == 'italic':
-                                to_mark = '*' + to_mark + '*'
-                            elif mark['type'] == 'underline':
-                                to_mark = '__' + to_mark + '__'
-                            elif mark['type'] == 'strikethrough':
-                                to_mark = '~~' + to_mark + '~~'
-                            elif mark['type'] == 'spoiler':
-                                to_mark = '||' + to_mark + '||'
-                            else:
-                                pass
-                        caption += to_mark.format(
-                            unmarked_content=str(leaf['text'])
-                        )
-
-                self.caption = caption
-            else:
-                self.caption = None
+                self._caption_leaves = node.get('leaves', [])
+
+    @property
+    def caption(self):
+        if self._caption is None and self._caption_leaves is not None:
+            self._caption = render_leaves(self._caption_leaves)
+        return self._caption
 
     @property
     def filename(self):
@@ -254,15 +381,6 @@ class Attachment:
             # self.url is probably None
             return None
 
-    async def read(self):
-        """|coro|
-
-        Returns
-        ---------
-        :class:`bytes`
-        """
-        return await self._state.read_filelike_data(self)
-
     async def to_file(self):
         """|coro|
 
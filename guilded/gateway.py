@@ -51,16 +51,14 @@ DEALINGS IN THE SOFTWARE.
 
 import aiohttp
 import asyncio
-import concurrent.futures
+import collections
 import datetime
-import json
 import logging
-import sys
-import threading
-import traceback
+import time
 
 from guilded.abc import TeamChannel
 
+from . import utils
 from .errors import GuildedException
 from .channel import DMChannel, Thread
 from .message import Message
@@ -77,6 +75,23 @@ class WebSocketClosure(Exception):
 class GuildedWebSocket:
     """Implements Guilded's global gateway as well as team websocket connections."""
     HEARTBEAT_PAYLOAD = '2'
+    HEARTBEAT_ACK_PAYLOAD = '3'
+
+    # engine.io packet types
+    OPEN = 0
+    CLOSE = 1
+    PING = 2
+    PONG = 3
+    MESSAGE = 4
+    UPGRADE = 5
+    NOOP = 6
+
+    # socket.io packet types, carried inside engine.io messages
+    CONNECT = 0
+    DISCONNECT = 1
+    EVENT = 2
+    ACK = 3
+    ERROR = 4
     def __init__(self, socket, client, *, loop):
         self.client = client
         self.loop = loop
@@ -86,6 +101,9 @@ class GuildedWebSocket:
         self.socket = socket
         self._close_code = None
         self.team_id = None
+        # event frames read while the dispatch queues were full
+        self._held = collections.deque()
+        self._receiving = None
 
         # actual gateway garbage
         self.sid = None
@@ -97,7 +115,7 @@ class GuildedWebSocket:
 
     async def send(self, payload, *, raw=False):
         if raw is False:
-            payload = f'42{json.dumps(payload)}'
+            payload = f'42{utils._to_json(payload)}'
 
         self.client.dispatch('socket_raw_send', payload)
         return await self.socket.send_str(payload)
@@ -106,6 +124,12 @@ class GuildedWebSocket:
     def latency(self):
         return float('inf') if self._heartbeater is None else self._heartbeater.latency
 
+    @property
+    def latency_history(self):
+        """List[:class:`float`]: The round trip times of the most recent
+        heartbeats, oldest first."""
+        return [] if self._heartbeater is None else list(self._heartbeater.history)
+
     @classmethod
     async def build(cls, client, *, loop=None, **gateway_args):
         log.info('Connecting to the gateway with args %s', gateway_args)
@@ -120,51 +144,97 @@ class GuildedWebSocket:
         ws = cls(socket, client, loop=loop or asyncio.get_event_loop())
         ws.team_id = gateway_args.get('teamId')
         ws._parsers = WebSocketEventParsers(client)
-        await ws.send(GuildedWebSocket.HEARTBEAT_PAYLOAD, raw=True)
-        await ws.poll_event()
+        try:
+            # the server opens with its hello, which starts the heartbeater
+            await ws.poll_event()
+        except BaseException:
+            # don't leave a half-open socket behind
+            if ws._heartbeater is not None:
+                ws._heartbeater.stop()
+            await socket.close()
+            raise
 
         return ws
 
     def _pretty_event(self, payload):
+        event_name = None
         if isinstance(payload, list):
-            payload = payload[1]
-        if not payload.get('type'):
-            return payload
+            event_name = payload[0] if payload else None
+            payload = payload[1] if len(payload) > 1 else {}
+        if not isinstance(payload, dict):
+            return {'type': event_name, 'data': payload}
 
+        # the payload itself becomes the event data, so no copy is made
         return {
-            'type': payload.pop('type'),
-            'data': {k: v for k, v in payload.items()}
+            'type': payload.pop('type', None) or event_name,
+            'data': payload
         }
 
-    def _full_event_parse(self, payload):
-        for char in payload:
-            if char.isdigit(): payload = payload.replace(char, '', 1)
-            else: break
-        data = json.loads(payload)
-        return self._pretty_event(data)
+    @classmethod
+    def _decode_packet(cls, payload):
+        """Split a raw frame into its engine.io type, socket.io type (for
+        messages) and decoded JSON data, finding the numeric prefix by index
+        so that the frame is only sliced once.
+        """
+        length = len(payload)
+        if not length:
+            return None, None, None
+
+        index = 0
+        engine_type = None
+        socket_type = None
+        if payload[0].isdigit():
+            engine_type = ord(payload[0]) - 48
+            index = 1
+            if engine_type == cls.MESSAGE and index < length and payload[index].isdigit():
+                socket_type = ord(payload[index]) - 48
+                index += 1
+                # skip the ack id, if there is one
+                while index < length and payload[index].isdigit():
+                    index += 1
+
+        if index >= length:
+            return engine_type, socket_type, None
+
+        data = utils._from_json(payload[index:] if index else payload)
+        return engine_type, socket_type, data
 
     async def received_event(self, payload):
-        if payload.isdigit():
+        engine_type, socket_type, data = self._decode_packet(payload)
+        if engine_type == self.PONG:
+            if self._heartbeater is not None:
+                self._heartbeater.ack()
+            return
+
+        if data is None:
+            # pings, noops, and socket.io connects have nothing to parse
             return
 
         self.client.dispatch('socket_raw_receive', payload)
-        data = self._full_event_parse(payload)
-        self.client.dispatch('socket_response', data)
-        log.debug('Received %s', data)
 
-        if data.get('sid') is not None:
+        if engine_type == self.OPEN:
             # hello
+            self.client.dispatch('socket_response', data)
+            log.debug('Received %s', data)
             self.sid = data['sid']
             self.upgrades = data['upgrades']
-            self._heartbeater = Heartbeater(ws=self, interval=data['pingInterval'] / 1000)
-            # maybe implement timeout later, idk
-            
-            #await self.send(self.HEARTBEAT_PAYLOAD, raw=True)
-            # not sure if a heartbeat should be sent here since it's sent when starting the heartbeater anyway
-            # (doing so results in double heartbeat)
+            interval = data['pingInterval'] / 1000
+            timeout = data.get('pingTimeout', data['pingInterval']) / 1000
+            if self._heartbeater is not None:
+                self._heartbeater.stop()
+            self._heartbeater = Heartbeater(ws=self, interval=interval, timeout=timeout)
             self._heartbeater.start()
             return
 
+        if socket_type != self.EVENT:
+            self.client.dispatch('socket_response', data)
+            log.debug('Received %s', data)
+            return
+
+        data = self._pretty_event(data)
+        self.client.dispatch('socket_response', data)
+        log.debug('Received %s', data)
+
         event = self._parsers.get(data['type'], data['data'])
         if event is None:
             # ignore unhandled events
@@ -180,29 +250,114 @@ class GuildedWebSocket:
             self.client.dispatch('error', exc)
             raise exc from e
 
+    @classmethod
+    def _is_event(cls, payload):
+        return payload[:2] == f'{cls.MESSAGE}{cls.EVENT}'
+
     async def poll_event(self):
-        msg = await self.socket.receive()
+        scheduler = self.client._scheduler
+        if self._held and scheduler.has_capacity:
+            # dispatch the events read while the queues were full, in order
+            await self.received_event(self._held.popleft())
+            return None
+
+        # backpressure: while a dispatch queue is full, events are held as
+        # raw frames and not parsed, but the socket is still read so that
+        # pongs keep the heartbeat alive. once as many events are held as
+        # may be queued, the socket isn't read at all until there is room
+        receiving = self._receiving
+        if self._held and len(self._held) >= (scheduler.max_queue or 1):
+            await scheduler.wait_for_capacity()
+            return None
+
+        if self._held:
+            if receiving is None:
+                receiving = self._receiving = asyncio.ensure_future(self.socket.receive())
+            capacity = asyncio.ensure_future(scheduler.wait_for_capacity())
+            await asyncio.wait((receiving, capacity), return_when=asyncio.FIRST_COMPLETED)
+            capacity.cancel()
+            if not receiving.done():
+                return None
+
+        if receiving is not None:
+            self._receiving = None
+            msg = await receiving
+        else:
+            msg = await self.socket.receive()
+
         if msg.type is aiohttp.WSMsgType.TEXT:
-            await self.received_event(msg.data)
+            if self._is_event(msg.data) and (self._held or not scheduler.has_capacity):
+                self._held.append(msg.data)
+            else:
+                await self.received_event(msg.data)
         elif msg.type is aiohttp.WSMsgType.ERROR:
+            if self._heartbeater is not None:
+                self._heartbeater.stop()
             raise msg.data
         elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSE):
+            if self._heartbeater is not None:
+                self._heartbeater.stop()
             raise WebSocketClosure('Socket is in a closed or closing state.')
         return None
 
     async def close(self, code=1000):
         self._close_code = code
+        if self._heartbeater is not None:
+            self._heartbeater.stop()
+        if self._receiving is not None:
+            self._receiving.cancel()
         await self.send(['logout'])
         await self.socket.close(code=code)
 
 class WebSocketEventParsers:
+    # gateway event -> the client events its parser can dispatch. events
+    # that nobody listens to are dropped before any models are built,
+    # unless their parser also keeps the cache up to date
+    EVENTS = {
+        'ChatMessageCreated': ('message',),
+        'ChatChannelTyping': ('typing',),
+        'ChatMessageDeleted': ('raw_message_delete', 'message_delete'),
+        'ChatPinnedMessageCreated': ('raw_team_message_pinned', 'raw_dm_message_pinned', 'team_message_pinned', 'dm_message_pinned'),
+        'ChatPinnedMessageDeleted': ('raw_team_message_unpinned', 'raw_dm_message_unpinned', 'team_message_unpinned', 'dm_message_unpinned'),
+        'ChatMessageUpdated': ('raw_message_edit', 'message_edit'),
+        'TeamXpSet': ('member_update',),
+        'TeamMemberUpdated': ('raw_member_update', 'member_update'),
+        'teamRolesUpdates': ('member_update',),
+        'TemporalChannelCreated': ('team_thread_created',),
+        'TeamMemberRemoved': (),
+        'TeamMemberJoined': ('member_join',),
+        'USER_UPDATED': (),
+        'USER_PRESENCE_MANUALLY_SET': (),
+    }
+    STATEFUL = {'TeamXpSet', 'TeamMemberUpdated', 'teamRolesUpdates', 'TeamMemberRemoved', 'TeamMemberJoined', 'USER_PRESENCE_MANUALLY_SET'}
+    MESSAGE_CACHE_EVENTS = {'ChatMessageCreated', 'ChatMessageDeleted', 'ChatMessageUpdated'}
+
     def __init__(self, client):
         self.client = client
         self._state = client.http
 
+        stateful = set(self.STATEFUL)
+        if self._state._cache_policy.caches('messages'):
+            stateful |= self.MESSAGE_CACHE_EVENTS
+
+        self._handlers = {
+            name: (getattr(self, name), events, name in stateful)
+            for name, events in self.EVENTS.items()
+        }
+
+    def _listening(self, events):
+        has_listener = self.client._has_listener
+        for event in events:
+            if has_listener(event):
+                return True
+        return False
+
     def get(self, event_name, data):
-        coro = getattr(self, event_name, None)
-        if not coro:
+        try:
+            coro, events, stateful = self._handlers[event_name]
+        except KeyError:
+            return None
+        if not stateful and not self._listening(events):
             return None
         return coro(data)
 
@@ -248,12 +403,8 @@ class WebSocketEventParsers:
         data['cached_message'] = message
         self.client.dispatch('raw_message_delete', data)
         if message is not None:
-            try:
-                self.client.cached_messages.remove(message)
-            except:
-                pass
-            finally:
-                self.client.dispatch('message_delete', message)
+            self._state.remove_from_message_cache(message.id)
+            self.client.dispatch('message_delete', message)
 
     async def ChatPinnedMessageCreated(self, data):
         if data.get('channelType') == 'Team':
@@ -309,8 +460,9 @@ class WebSocketEventParsers:
         self.client.dispatch('member_update', before, after)
 
     async def TeamMemberUpdated(self, data):
-        raw_after = Member(state=self._state, data=data)
-        self.client.dispatch('raw_member_update', raw_after)
+        if self.client._has_listener('raw_member_update'):
+            raw_after = Member(state=self._state, data=data)
+            self.client.dispatch('raw_member_update', raw_after)
 
         team = self.client.get_team(data['teamId'])
         if team is None: return
@@ -322,10 +474,9 @@ class WebSocketEventParsers:
         if before is None:
             return
 
-        for key, val in data['userInfo'].items():
-            after = team.get_member(data['userId'])
-            setattr(after, key, val)
-            self._state.add_to_member_cache(after)
+        after = team.get_member(data['userId'])
+        after._update(data['userInfo'])
+        self._state.add_to_member_cache(after)
 
         self.client.dispatch('member_update', before, after)
 
@@ -377,44 +528,59 @@ class WebSocketEventParsers:
         # not sure if an event should be dispatched for this
         # it happens when you set your own presence
 
-class Heartbeater(threading.Thread):
-    def __init__(self, ws, *, interval):
+class Heartbeater:
+    """Keeps a websocket alive by sending engine.io pings on the event loop,
+    measuring the round trip of each ping and closing the socket if a pong
+    does not arrive in time.
+    """
+    def __init__(self, ws, *, interval, timeout=None, history=20):
         self.ws = ws
         self.interval = interval
-        #self.heartbeat_timeout = timeout
-        threading.Thread.__init__(self)
+        self.timeout = timeout or interval
 
-        self.msg = 'Keeping websocket alive with sequence %s.'
-        self.block_msg = 'Websocket heartbeat blocked for more than %s seconds.'
-        self.behind_msg = 'Can\'t keep up, websocket is %.1fs behind.'
-        self._stop_ev = threading.Event()
         self.latency = float('inf')
+        self.history = collections.deque(maxlen=history)
+        self._last_send = None
+        self._ack = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        self._task = self.ws.loop.create_task(self.run())
+
+    def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
 
-    def run(self):
-        log.debug('Started heartbeat thread')
-        while not self._stop_ev.wait(self.interval):
+    def ack(self):
+        if self._last_send is None or self._ack.is_set():
+            # no ping of ours is waiting on this pong
+            return
+        self.latency = time.perf_counter() - self._last_send
+        self.history.append(self.latency)
+        self._ack.set()
+
+    async def run(self):
+        log.debug('Started heartbeat task')
+        while True:
+            self._ack.clear()
             log.debug('Sending heartbeat')
-            coro = self.ws.send(GuildedWebSocket.HEARTBEAT_PAYLOAD, raw=True)
-            f = asyncio.run_coroutine_threadsafe(coro, loop=self.ws.loop)
+            self._last_send = time.perf_counter()
             try:
-                total = 0
-                while True:
-                    try:
-                        f.result(10)
-                        break
-                    except concurrent.futures.TimeoutError:
-                        total += 10
-                        try:
-                            frame = sys._current_frames()[self._main_thread_id]
-                        except KeyError:
-                            msg = self.block_msg
-                        else:
-                            stack = traceback.format_stack(frame)
-                            msg = '%s\nLoop thread traceback (most recent call last):\n%s' % (self.block_msg, ''.join(stack))
-                        log.warning(msg, total)
-
+                await self.ws.send(GuildedWebSocket.HEARTBEAT_PAYLOAD, raw=True)
             except Exception:
-                self.stop()
+                # the socket is already closing; poll_event will notice
+                return
 
-    def stop(self):
-        self._stop_ev.set()
+            try:
+                await asyncio.wait_for(self._ack.wait(), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                log.warning(
+                    'No heartbeat acknowledgement in %s seconds%s, closing zombie connection.',
+                    self.timeout,
+                    f' for team {self.ws.team_id}' if self.ws.team_id else ''
+                )
+                self.ws._close_code = 4000
+                await self.ws.socket.close(code=4000)
+                return
+
+            await asyncio.sleep(max(self.interval - self.latency, 0))
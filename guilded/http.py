@@ -51,37 +51,147 @@ DEALINGS IN THE SOFTWARE.
 
 import asyncio
 import datetime
-import json
+import email.utils
 import logging
+import re
+import time
+import weakref
+from operator import attrgetter
 from typing import Union
 
 from . import utils
 from . import channel
+from .cache import CachePolicy
 from .embed import Embed
-from .errors import ClientException, HTTPException, error_mapping
-from .file import File
+from .errors import ClientException, GuildedServerError, HTTPException, MediaTooLarge, TooManyRequests, error_mapping
+from .file import Attachment, File
 from .message import ChatMessage
+from .outbound import OutboundQueue
 from .user import User, Member
 
 log = logging.getLogger(__name__)
 
+_MAJOR_PARAMETER_REGEX = re.compile(r'^/(?P<resource>channels|teams)/(?P<id>[^/?]+)')
+
 class Route:
     BASE = 'https://www.guilded.gg/api'
     MEDIA_BASE = 'https://media.guilded.gg'
     CDN_BASE = 'https://s3-us-west-2.amazonaws.com/www.guilded.gg'
     NO_BASE = ''
-    def __init__(self, method, path, *, override_base=None):
+    def __init__(self, method, path, *, override_base=None, concurrent=False):
         self.method = method
         self.path = path
+        # whether requests to this route may run at the same time as others
+        # in its bucket, rather than one after another
+        self.concurrent = concurrent
 
         if override_base is not None:
             self.BASE = override_base
 
         self.url = self.BASE + path
 
+        # top-level resources that requests are ratelimited by
+        self.channel_id = None
+        self.team_id = None
+        match = _MAJOR_PARAMETER_REGEX.match(path)
+        if match is not None:
+            if match.group('resource') == 'channels':
+                self.channel_id = match.group('id')
+            else:
+                self.team_id = match.group('id')
+
+    @property
+    def bucket(self):
+        major = self.channel_id or self.team_id
+        if major is None:
+            return f'{self.method} {self.BASE}{self.path}'
+        return f'{self.method} {major}'
+
+class MaybeUnlock:
+    def __init__(self, lock):
+        self.lock = lock
+        self._unlock = True
+
+    def __enter__(self):
+        return self
+
+    def defer(self):
+        self._unlock = False
+
+    def __exit__(self, type, value, traceback):
+        if self._unlock:
+            self.lock.release()
+
+def _parse_retry_after(value, default=5.0):
+    if value is None:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        # Retry-After may also be an HTTP date
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return default
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=datetime.timezone.utc)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return max((when - now).total_seconds(), 0.0)
+
+class RequestTrace:
+    """A record of an HTTP request made by the library, passed to the
+    ``request_hook`` of a :class:`Client`.
+
+    Attributes
+    ------------
+    method: :class:`str`
+        The HTTP method of the request.
+    path: :class:`str`
+        The path of the request, relative to its base URL.
+    bucket: :class:`str`
+        The rate limit bucket the request was made in.
+    status: Optional[:class:`int`]
+        The HTTP status of the last response. ``None`` if no response was
+        received.
+    bytes: :class:`int`
+        The size of the last response body.
+    latency: :class:`float`
+        The number of seconds the request took, including rate limit waits
+        and retries.
+    retries: :class:`int`
+        The number of times the request was retried.
+    """
+    __slots__ = ('method', 'path', 'bucket', 'status', 'bytes', 'latency', 'retries')
+
+    def __init__(self, route):
+        self.method = route.method
+        self.path = route.path
+        self.bucket = route.bucket
+        self.status = None
+        self.bytes = 0
+        self.latency = 0.0
+        self.retries = 0
+
+    def __repr__(self):
+        return (
+            f'<RequestTrace method={self.method} path={self.path!r} status={self.status} '
+            f'bytes={self.bytes} latency={self.latency:.3f} retries={self.retries}>'
+        )
+
 class HTTPClient:
-    def __init__(self, *, session, max_messages=1000):
+    def __init__(self, *, session, cache_policy=None, request_hook=None, send_queue=False, send_coalesce_window=0.05, send_coalesce_limit=10, max_concurrent_uploads=4, upload_cache=None):
         self.session = session
+        self._request_hook = request_hook
+        # coroutine hooks that are still running, kept so they aren't
+        # garbage collected mid-run
+        self._hook_tasks = set()
+        self.max_concurrent_uploads = max_concurrent_uploads
+        self._upload_cache = upload_cache
+        self._send_queue = OutboundQueue(
+            self,
+            window=send_coalesce_window,
+            limit=send_coalesce_limit
+        ) if send_queue else None
         self.ws = None
         self.my_id = None
 
@@ -89,16 +199,25 @@ class HTTPClient:
         self.password = None
         self.cookie = None
 
-        self._max_messages = max_messages
-        self._users = {}
+        self._cache_policy = cache_policy = cache_policy or CachePolicy()
+        self._locks = weakref.WeakValueDictionary()
+        self._global_over = asyncio.Event()
+        self._global_over.set()
         self._teams = {}
         self._emojis = {}
-        self._messages = {}
-        self._team_members = {}
-        self._team_channels = {}
-        self._team_threads = {}
-        self._threads = {}
-        self._dm_channels = {}
+        self._users = cache_policy.build('users')
+        # every live User, cached or not, so that members of many teams and
+        # repeated payloads for one person share a single object
+        self._user_identities = weakref.WeakValueDictionary()
+        self._messages = cache_policy.build('messages')
+        self._team_members = cache_policy.build(
+            'members',
+            key=attrgetter('team_id', 'id'),
+            group=attrgetter('team_id')
+        )
+        self._team_channels = cache_policy.build('channels', group=attrgetter('team_id'))
+        self._threads = cache_policy.build('threads', group=attrgetter('team_id'))
+        self._dm_channels = cache_policy.build('dm_channels')
 
     def _get_user(self, id):
         return self._users.get(id)
@@ -116,54 +235,86 @@ class HTTPClient:
         return self._threads.get(id)
 
     def _get_team_channel(self, team_id, id):
-        return self._team_channels.get(team_id, {}).get(id)
-
-    @property
-    def _all_team_channels(self):
-        all_channels = {}
-        for team in self._team_channels.values():
-            for channel_id, channel in team.items():
-                all_channels[channel_id] = channel
-
-        return all_channels
+        channel = self._team_channels.get(id)
+        if channel is not None and channel.team_id == team_id:
+            return channel
 
     def _get_global_team_channel(self, id):
-        return self._all_team_channels.get(id)
+        return self._team_channels.get(id)
+
+    def _get_bucket_lock(self, method, path):
+        return self._locks.get(Route(method, path).bucket)
 
     def _get_team_thread(self, team_id, id):
-        return self._team_threads.get(team_id, {}).get(id)
+        thread = self._threads.get(id)
+        if thread is not None and thread.team_id == team_id:
+            return thread
 
     def _get_team_member(self, team_id, id):
-        return self._team_members.get(team_id, {}).get(id)
+        return self._team_members.get((team_id, id))
 
     def add_to_message_cache(self, message):
-        if self._max_messages is None:
-            return
-        self._messages[message.id] = message
-        while len(self._messages) > self._max_messages:
-            del self._messages[list(self._messages.keys())[0]]
+        if self._cache_policy.caches('messages'):
+            self._messages.add(message)
+
+    def remove_from_message_cache(self, message_id):
+        return self._messages.remove(message_id)
 
     def add_to_team_cache(self, team):
         self._teams[team.id] = team
 
+    def _store_user(self, data, *, partial=False, **extra):
+        # partial payloads, such as mentions, only fill in what an existing
+        # user is missing, since their fields may be specific to one team
+        id = data.get('id')
+        if id is None:
+            # nothing to identify it by, so it is neither shared nor cached
+            return User(state=self, data=data, **extra)
+
+        user = self._user_identities.get(id)
+        if user is None:
+            user = User(state=self, data=data, **extra)
+            self._user_identities[id] = user
+        else:
+            if partial:
+                data = {key: value for key, value in data.items() if user._data.get(key) is None}
+                if data:
+                    user._update(data)
+            elif data is not user._data:
+                user._update(data)
+            if extra.get('friend_status') is not None:
+                user.friend_status = extra['friend_status']
+            if extra.get('friend_created_at') is not None:
+                user.friend_requested_at = extra['friend_created_at']
+
+        self.add_to_user_cache(user)
+        return user
+
+    def add_to_user_cache(self, user):
+        if self._cache_policy.caches('users'):
+            self._users.add(user)
+
     def add_to_member_cache(self, member):
-        self._team_members[member.team_id] = self._team_members.get(member.team_id, {})
-        self._team_members[member.team_id][member.id] = member
+        if self._cache_policy.caches('members'):
+            self._team_members.add(member)
 
     def remove_from_member_cache(self, team_id, member_id):
-        try: del self._team_members[team_id][member_id]
-        except KeyError: pass
+        return self._team_members.remove((team_id, member_id))
 
     def add_to_team_channel_cache(self, channel):
-        self._team_channels[channel.team_id] = self._team_channels.get(channel.team_id, {})
-        self._team_channels[channel.team_id][channel.id] = channel
+        if self._cache_policy.caches('channels'):
+            self._team_channels.add(channel)
 
     def remove_from_team_channel_cache(self, channel_id):
-        try: del self._team_channels[channel_id]
-        except KeyError: pass
+        return self._team_channels.remove(channel_id)
+
+    def add_to_thread_cache(self, thread):
+        if self._cache_policy.caches('threads'):
+            self._threads.add(thread)
 
     def add_to_dm_channel_cache(self, channel):
-        self._dm_channels[channel.id] = channel
+        if self._cache_policy.caches('dm_channels'):
+            self._dm_channels.add(channel)
 
     @property
     def credentials(self):
@@ -173,56 +324,156 @@ class HTTPClient:
         url = route.url
         method = route.method
 
-        async def perform():
-            log_data = ''
-            if kwargs.get('json'):
-                log_data = f' with {kwargs["json"]}'
-            elif kwargs.get('data'):
-                log_data = f' with {kwargs["data"]}'
-            log_args = ''
-            if kwargs.get('params'):
-                log_args = '?' + '&'.join([f'{key}={val}' for key, val in kwargs['params'].items()])
-            log.info('%s %s%s%s', method, route.url, log_args, log_data)
-            response = await self.session.request(method, url, **kwargs)
-            log.info('Guilded responded with HTTP %s', response.status)
-            if response.status == 204:
-                return None
+        bucket = route.bucket
+        lock = self._locks.get(bucket)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[bucket] = lock
 
-            try:
-                data_txt = await response.text()
-            except UnicodeDecodeError:
-                data = await response.read()
-                log.debug('Response data: bytes')
-            else:
-                try:
-                    data = json.loads(data_txt)
-                except json.decoder.JSONDecodeError:
-                    data = data_txt
-                log.debug(f'Response data: {data}')
-            if response.status != 200:
-
-                if response.status == 429:
-                    retry_after = response.headers.get('Retry-After')
-                    log.warning(
-                        'Rate limited on %s. Retrying in %s seconds',
-                        route.path,
-                        retry_after or 5
-                    )
-                    if retry_after:
-                        await asyncio.sleep(retry_after)
-                        data = await perform()
-                    else:
-                        await asyncio.sleep(5)
-                        data = await perform()
-                        #raise TooManyRequests(response)
-
-                elif response.status >= 400:
-                    exception = error_mapping.get(response.status, HTTPException)
-                    raise exception(response, data)
-
-            return data if route.path != '/login' else response
-
-        return await perform()
+        if not self._global_over.is_set():
+            # wait until the global ratelimit is over
+            await self._global_over.wait()
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                '%s %s with params %s and body %s',
+                method, url, kwargs.get('params'), kwargs.get('json', kwargs.get('data'))
+            )
+
+        # a callable that builds the body for each attempt, for bodies that
+        # can only be sent once
+        form = kwargs.pop('form', None)
+
+        if 'json' in kwargs:
+            headers = kwargs.setdefault('headers', {})
+            headers['Content-Type'] = 'application/json'
+            kwargs['data'] = utils._to_json(kwargs.pop('json'))
+
+        tracing = self._request_hook is not None or log.isEnabledFor(logging.DEBUG)
+        trace = RequestTrace(route) if tracing else None
+        start = time.perf_counter()
+
+        await lock.acquire()
+        if route.concurrent:
+            # the lock is only used to wait out an exhausted bucket
+            lock.release()
+        try:
+            with MaybeUnlock(lock) as maybe_lock:
+                if route.concurrent:
+                    maybe_lock.defer()
+                for tries in range(5):
+                    log.info('%s %s', method, url)
+                    if form is not None:
+                        kwargs['data'] = form()
+                    async with self.session.request(method, url, **kwargs) as response:
+                        log.info('Guilded responded with HTTP %s', response.status)
+                        if trace is not None:
+                            trace.status = response.status
+                            trace.retries = tries
+
+                        if response.status == 204:
+                            return None
+
+                        body = await response.read()
+                        if trace is not None:
+                            trace.bytes = len(body)
+
+                        try:
+                            data_txt = await response.text()
+                        except UnicodeDecodeError:
+                            data = body
+                            log.debug('Response data: bytes')
+                        else:
+                            try:
+                                data = utils._from_json(data_txt)
+                            except ValueError:
+                                data = data_txt
+                            log.debug('Response data: %s', data)
+
+                        # the bucket is depleted, so hold onto the lock until it
+                        # resets. responses that are about to be retried keep the
+                        # lock as they are, so that the release is only deferred once
+                        retrying = tries < 4 and response.status in (429, 500, 502)
+                        remaining = response.headers.get('X-RateLimit-Remaining')
+                        if remaining == '0' and not retrying:
+                            delta = _parse_retry_after(response.headers.get('X-RateLimit-Reset-After'), default=1.0)
+                            log.debug('A rate limit bucket (%s) has been exhausted. Pre-emptively waiting %.2f seconds.', bucket, delta)
+                            if route.concurrent:
+                                if not lock.locked():
+                                    await lock.acquire()
+                                    asyncio.get_event_loop().call_later(delta, lock.release)
+                            else:
+                                maybe_lock.defer()
+                                asyncio.get_event_loop().call_later(delta, lock.release)
+
+                        if 300 > response.status >= 200:
+                            return data if route.path != '/login' else response
+
+                        if response.status == 429:
+                            if not retrying:
+                                break
+
+                            retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+                            is_global = response.headers.get('X-RateLimit-Global') is not None
+                            log.warning(
+                                'Rate limited on %s%s. Retrying in %.2f seconds',
+                                route.path,
+                                ' (global)' if is_global else '',
+                                retry_after
+                            )
+                            if is_global:
+                                self._global_over.clear()
+
+                            await asyncio.sleep(retry_after)
+
+                            if is_global:
+                                self._global_over.set()
+                                log.debug('Global rate limit is now over.')
+
+                            continue
+
+                        # unconditional retry on gateway-ish server errors
+                        if response.status in (500, 502):
+                            if not retrying:
+                                break
+
+                            await asyncio.sleep(1 + tries * 2)
+                            continue
+
+                        if response.status >= 400:
+                            exception = error_mapping.get(response.status, HTTPException)
+                            raise exception(response, data)
+
+                        return data if route.path != '/login' else response
+
+                # we've run out of retries
+                if response.status >= 500:
+                    raise GuildedServerError(response, data)
+
+                raise TooManyRequests(response, data)
+
+        finally:
+            if trace is not None:
+                trace.latency = time.perf_counter() - start
+                self._emit_trace(trace)
+
+    def _emit_trace(self, trace):
+        log.debug('%r', trace)
+        if self._request_hook is None:
+            return
+        try:
+            result = self._request_hook(trace)
+            if asyncio.iscoroutine(result):
+                task = asyncio.ensure_future(result)
+                self._hook_tasks.add(task)
+                task.add_done_callback(self._hook_done)
+        except Exception:
+            log.exception('Ignoring exception in request hook')
+
+    def _hook_done(self, task):
+        self._hook_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.error('Ignoring exception in request hook', exc_info=task.exception())
 
     # state
 
@@ -344,7 +595,12 @@ class HTTPClient:
         try:
             files = fields['files']
         except KeyError:
-            if fields.get('old_files'):
+            if fields.get('old_attachments'):
+                # the original nodes already point at the uploaded media, so
+                # they can be sent back as they are
+                for attachment in fields['old_attachments']:
+                    payload['content']['document']['nodes'].append(attachment._node)
+            elif fields.get('old_files'):
                 files = fields.get('old_files')
                 for file in files:
                     payload['content']['document']['nodes'].append({
@@ -355,6 +611,9 @@ class HTTPClient:
                     })
         else:
             for file in files:
+                if isinstance(file, Attachment):
+                    payload['content']['document']['nodes'].append(file._node)
+                    continue
                 payload['content']['document']['nodes'].append({
                     'object': 'block',
                     'type': file.file_type,
@@ -448,7 +707,7 @@ class HTTPClient:
         else:
             async def get_team_member_as_object():
                 data = await self.get_detailed_team_members(team_id, [user_id])
-                return Member(state=self, data=data[user_id])
+                return self.create_member(data=data[user_id])
             return get_team_member_as_object()
 
     def get_team_channels(self, team_id: str):
@@ -556,7 +815,7 @@ class HTTPClient:
         else:
             async def get_user_as_object():
                 data = await self.request(Route('GET', f'/users/{user_id}'))
-                return User(state=self, data=data)
+                return self.create_user(data=data)
             return get_user_as_object()
 
     def get_privacy_settings(self):
@@ -659,11 +918,39 @@ class HTTPClient:
     # media.guilded.gg
 
     def upload_file(self, file):
-        return self.request(Route('POST', '/media/upload', override_base=Route.MEDIA_BASE),
-            data={'file': file._bytes},
+        return self.request(Route('POST', '/media/upload', override_base=Route.MEDIA_BASE, concurrent=True),
+            form=file._form,
             params={'dynamicMediaTypeId': str(file.type)}
         )
 
+    async def upload_files(self, files):
+        """Upload every file that does not have a URL yet, up to
+        ``max_concurrent_uploads`` at a time. If one upload fails, the rest
+        are cancelled and the error is raised."""
+        pending = []
+        for file in files:
+            if file.url is None and file not in pending:
+                pending.append(file)
+        if not pending:
+            return files
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_uploads)
+
+        async def upload(file):
+            async with semaphore:
+                await file._upload(self)
+
+        tasks = [asyncio.ensure_future(upload(file)) for file in pending]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        return files
+
     def execute_webhook(self, webhook_id: str, webhook_token: str, data: dict):
         return self.request(Route('POST', f'/webhooks/{webhook_id}/{webhook_token}', override_base=Route.MEDIA_BASE), json=data)
 
@@ -688,7 +975,101 @@ class HTTPClient:
         return self.request(Route('PUT', f'/invites/{invite_code}'), json={'type': 'consume'})
 
     def read_filelike_data(self, filelike):
-        return self.request(Route('GET', filelike.url, override_base=Route.NO_BASE))
+        return self.read_media(filelike.url)
+
+    async def _get_media(self, url, *, range=None):
+        headers = {}
+        if range is not None:
+            start, end = range
+            headers['Range'] = f'bytes={start}-{"" if end is None else end}'
+
+        if not self._global_over.is_set():
+            await self._global_over.wait()
+
+        log.info('GET %s (media)', url)
+        response = await self.session.get(url, headers=headers)
+        if response.status >= 400:
+            async with response:
+                body = await response.read()
+            try:
+                data = utils._from_json(body)
+            except ValueError:
+                data = body.decode('utf-8', 'replace')
+            exception = error_mapping.get(response.status, HTTPException)
+            raise exception(response, data)
+
+        return response
+
+    async def stream_media(self, url, *, chunk_size=65536, max_size=None, range=None):
+        """Download media as an async iterator of :class:`bytes` chunks. The
+        body is never decoded as text.
+
+        ``range`` is a ``(start, end)`` tuple of inclusive byte offsets, where
+        ``end`` may be ``None`` to read to the end. If the server ignores the
+        range and sends the whole file, only the requested bytes are yielded.
+        :exc:`MediaTooLarge` is raised as soon as the media is known to be
+        larger than ``max_size``.
+        """
+        response = await self._get_media(url, range=range)
+        async with response:
+            length = response.content_length
+            skip = 0
+            remaining = None
+            if range is not None and response.status != 206:
+                # the range was ignored, so it is cut out of the full body
+                skip, end = range
+                if end is not None:
+                    remaining = end - skip + 1
+                if length is not None:
+                    length = max(min(length - skip, remaining or length), 0)
+                else:
+                    length = remaining
+
+            if max_size is not None and length is not None and length > max_size:
+                raise MediaTooLarge(length, max_size)
+
+            received = 0
+            async for chunk in response.content.iter_chunked(chunk_size):
+                if skip:
+                    if len(chunk) <= skip:
+                        skip -= len(chunk)
+                        continue
+                    chunk = chunk[skip:]
+                    skip = 0
+                if remaining is not None:
+                    chunk = chunk[:remaining]
+                    remaining -= len(chunk)
+
+                received += len(chunk)
+                if max_size is not None and received > max_size:
+                    raise MediaTooLarge(received, max_size)
+                if chunk:
+                    yield chunk
+                if remaining == 0:
+                    break
+
+    async def read_media(self, url, *, max_size=None, range=None):
+        """Download media into :class:`bytes`. Takes the same keyword
+        arguments as :meth:`stream_media`."""
+        if range is not None:
+            # may have to be cut out of the full body, see stream_media
+            return b''.join([chunk async for chunk in self.stream_media(url, max_size=max_size, range=range)])
+
+        response = await self._get_media(url)
+        async with response:
+            length = response.content_length
+            if max_size is None or (length is not None and length <= max_size):
+                return await response.read()
+            if length is not None:
+                raise MediaTooLarge(length, max_size)
+
+            # the size is not known up front, so it is checked as it arrives
+            buffer = bytearray()
+            async for chunk in response.content.iter_chunked(65536):
+                buffer += chunk
+                if len(buffer) > max_size:
+                    raise MediaTooLarge(len(buffer), max_size)
+            return bytes(buffer)
 
     # websocket
 
@@ -697,8 +1078,8 @@ class HTTPClient:
 
     # create objects from data
 
-    def create_user(self, **data):
-        return User(state=self, **data)
+    def create_user(self, *, data, partial=False, **extra):
+        return self._store_user(data.get('user', data), partial=partial, **extra)
 
     def create_member(self, **data):
         return Member(state=self, **data)
@@ -720,7 +1101,7 @@ class HTTPClient:
             elif ctype is channel.ChannelType.voice:
                 return channel.VoiceChannel(state=self, **data)
         else:
-            return channel.DMChannel(state=self, **data)
+            return channel.DMChannel(state=self, data=channel_data)
 
     def create_message(self, **data):
         data['channel'] = data.get('channel')
@@ -56,7 +56,8 @@ from typing import Optional
 
 from .embed import Embed
 from .file import MediaType, Attachment
-from .utils import ISO8601
+from .document import render_nodes
+from .utils import ISO8601, lazy_timestamp, parse_hex_number
 
 log = logging.getLogger(__name__)
 
@@ -220,6 +221,42 @@ class ChatMessage:
     bot_id: Optional[:class:`str`]
         The bot's ID that sent the message, if applicable.
     """
+    __slots__ = (
+        '_state',
+        '_raw',
+        'id',
+        'webhook_id',
+        'bot_id',
+        'channel',
+        'channel_id',
+        'team_id',
+        'team',
+        '_created_at',
+        '_edited_at',
+        '_deleted_at',
+        'author',
+        'author_id',
+        'replied_to',
+        'replied_to_ids',
+        'silent',
+        'private',
+        '_extracted',
+        '_mentions',
+        '_raw_mentions',
+        '_channel_mentions',
+        '_raw_channel_mentions',
+        '_role_mentions',
+        '_raw_role_mentions',
+        '_embeds',
+        '_attachments',
+        '_links',
+        '_content',
+    )
+
+    created_at = lazy_timestamp()
+    edited_at = lazy_timestamp()
+    deleted_at = lazy_timestamp()
+
     def __init__(self, *, state, channel, data, **extra):
         self._state = state
         self._raw = data
@@ -233,9 +270,9 @@ class ChatMessage:
         self.team_id = data.get('teamId')
         self.team = extra.get('team') or getattr(channel, 'team', None) or self._state._get_team(self.team_id)
 
-        self.created_at = ISO8601(data.get('createdAt'))
-        self.edited_at = ISO8601(message.get('editedAt'))
-        self.deleted_at = extra.get('deleted_at') or ISO8601(data.get('deletedAt'))
+        self.created_at = data.get('createdAt')
+        self.edited_at = message.get('editedAt')
+        self.deleted_at = extra.get('deleted_at') or data.get('deletedAt')
 
         self.author = extra.get('author')
         self.author_id = data.get('createdBy') or message.get('createdBy')
@@ -245,7 +282,7 @@ class ChatMessage:
             elif data.get('channelType', '').lower() == 'dm' or self.team is None:
                 self.author = self._state._get_user(self.author_id)
             elif data.get('createdByInfo'):
-                self.author = self._state.create_user(data=data['createdByInfo'])
+                self.author = self._state.create_user(data=data['createdByInfo'], partial=True)
 
         if self.author is not None:
             self.author.bot = self.created_by_bot
@@ -265,16 +302,10 @@ class ChatMessage:
                     continue
                 self.replied_to.append(message)
 
-        self.mentions = []
-        self.raw_mentions = []
-        self.channel_mentions = []
-        self.raw_channel_mentions = []
-        self.role_mentions = []
-        self.raw_role_mentions = []
-        self.embeds = []
-        self.attachments = []
-        self.links = []
-        self.content = self._get_full_content(data)
+        # mentions, links, embeds and attachments are collected together
+        # the first time any of them is accessed
+        self._extracted = False
+        self._content = None
 
     def __str__(self):
         return self.content
@@ -285,6 +316,82 @@ class ChatMessage:
     def __repr__(self):
         return f'<Message id={self.id!r} author={self.author!r} channel={self.channel!r}>'
 
+    @property
+    def _nodes(self):
+        try:
+            return self._raw.get('message', self._raw)['content']['document']['nodes']
+        except KeyError:
+            # empty message
+            return []
+
+    @property
+    def content(self):
+        """:class:`str`: The message's content as markdown. This is rendered
+        from the message's document the first time it is accessed."""
+        if self._content is None:
+            self._content = render_nodes(self._nodes)
+        return self._content
+
+    @property
+    def mentions(self):
+        """List[Union[:class:`Member`, :class:`User`]]: The users mentioned
+        in this message. Mentioned users that are not cached are partial."""
+        self._extract()
+        return self._mentions
+
+    @property
+    def raw_mentions(self):
+        """List[:class:`str`]: The user mentions in this message, as they
+        appear in :attr:`.content`."""
+        self._extract()
+        return self._raw_mentions
+
+    @property
+    def channel_mentions(self):
+        """List[:class:`abc.TeamChannel`]: The cached channels mentioned in
+        this message."""
+        self._extract()
+        return self._channel_mentions
+
+    @property
+    def raw_channel_mentions(self):
+        """List[:class:`str`]: The channel mentions in this message, as they
+        appear in :attr:`.content`."""
+        self._extract()
+        return self._raw_channel_mentions
+
+    @property
+    def role_mentions(self):
+        """List: The roles mentioned in this message. Roles are not cached
+        yet, so this is always empty."""
+        self._extract()
+        return self._role_mentions
+
+    @property
+    def raw_role_mentions(self):
+        """List[:class:`str`]: The role mentions in this message, as they
+        appear in :attr:`.content`."""
+        self._extract()
+        return self._raw_role_mentions
+
+    @property
+    def links(self):
+        """List[:class:`Link`]: The links in this message."""
+        self._extract()
+        return self._links
+
+    @property
+    def embeds(self):
+        """List[:class:`Embed`]: The embeds in this message."""
+        self._extract()
+        return self._embeds
+
+    @property
+    def attachments(self):
+        """List[:class:`Attachment`]: The images and videos in this message."""
+        self._extract()
+        return self._attachments
+
     @property
     def created_by_bot(self):
         return self.author.bot if self.author else (self.webhook_id is not None or self.bot_id is not None)
@@ -309,132 +416,95 @@ class ChatMessage:
         # basic compatibility w/ discord bot code, plan on deprecating in the future
         return self.team
 
-    def _get_full_content(self, data):
-        """Get the content of this message in an easy to use single string.
-        Attempts to append mentions, embeds, and attachments to the Message as well.
+    def _extract(self):
+        """Collect the mentions, links, embeds, and attachments in this
+        message's document, in one pass, if that has not been done yet.
 
         .. warning::
 
             Intended for internal use only.
         """
-        try:
-            nodes = data.get('message', data)['content']['document']['nodes']
-        except KeyError:
-            # empty message
-            return ''
-        content = ''
-        for node in nodes:
+        if self._extracted:
+            return
+        self._extracted = True
+
+        self._mentions = []
+        self._raw_mentions = []
+        self._channel_mentions = []
+        self._raw_channel_mentions = []
+        self._role_mentions = []
+        self._raw_role_mentions = []
+        self._embeds = []
+        self._attachments = []
+        self._links = []
+
+        for node in self._nodes:
             node_type = node['type']
             if node_type == 'paragraph':
                 for element in node['nodes']:
-                    if element['object'] == 'text':
-                        for leaf in element['leaves']:
-                            if not leaf['marks']:
-                                content += leaf['text']
+                    if element['object'] != 'inline':
+                        continue
+
+                    if element['type'] == 'mention':
+                        mentioned = element['data']['mention']
+                        if mentioned['type'] == 'role':
+                            self._raw_role_mentions.append(f'<@{mentioned["id"]}>')
+                        elif mentioned['type'] == 'person':
+                            self._raw_mentions.append(f'<@{mentioned["id"]}>')
+                            if self.team_id:
+                                user = self._state._get_team_member(self.team_id, mentioned['id'])
                             else:
-                                to_mark = '{unmarked_content}'
-                                marks = leaf['marks']
-                                for mark in marks:
-                                    if mark['type'] == 'bold':
-                                        to_mark = '**' + to_mark + '**'
-                                    elif mark['type'] == 'italic':
-                                        to_mark = '*' + to_mark + '*'
-                                    elif mark['type'] == 'underline':
-                                        to_mark = '__' + to_mark + '__'
-                                    elif mark['type'] == 'strikethrough':
-                                        to_mark = '~~' + to_mark + '~~'
-                                    elif mark['type'] == 'spoiler':
-                                        to_mark = '||' + to_mark + '||'
-                                    else:
-                                        pass
-                                content += to_mark.format(
-                                    unmarked_content=str(leaf['text'])
-                                )
-                    if element['object'] == 'inline':
-                        if element['type'] == 'mention':
-                            mentioned = element['data']['mention']
-                            if mentioned['type'] == 'role':
-                                content += f'<@{mentioned["id"]}>'
-                            elif mentioned['type'] == 'person':
-                                content += f'<@{mentioned["id"]}>'
-
-                                self.raw_mentions.append(f'<@{mentioned["id"]}>')
-                                if self.team_id:
-                                    user = self._state._get_team_member(self.team_id, mentioned['id'])
-                                else:
-                                    user = self._state._get_user(mentioned['id'])
+                                user = self._state._get_user(mentioned['id'])
 
-                                if user:
-                                    self.mentions.append(user)
-                                else:
-                                    name = mentioned.get('name')
-                                    if mentioned.get('nickname') is True and mentioned.get('matcher') is not None:
-                                        name = name.strip('@').strip(name).strip('@')
-                                        if not name.strip():
-                                            # matcher might be empty, oops - no username is available
-                                            name = None
-                                    if self.team_id:
-                                        self.mentions.append(self._state.create_member(
-                                            team=self.team,
-                                            data={
-                                                'id': mentioned.get('id'),
-                                                'name': name,
-                                                'profilePicture': mentioned.get('avatar'),
-                                                'colour': parse_hex_number(mentioned.get('color', '000000').strip('#')),
-                                                'nickname': mentioned.get('name') if mentioned.get('nickname') is True else None,
-                                                'bot': self.created_by_bot
-                                            }
-                                        ))
-                                    else:
-                                        self.mentions.append(self._state.create_user(data={
+                            if user:
+                                self._mentions.append(user)
+                            else:
+                                name = mentioned.get('name')
+                                if mentioned.get('nickname') is True and mentioned.get('matcher') is not None:
+                                    name = name.strip('@').strip(name).strip('@')
+                                    if not name.strip():
+                                        # matcher might be empty, oops - no username is available
+                                        name = None
+                                if self.team_id:
+                                    self._mentions.append(self._state.create_member(
+                                        team=self.team,
+                                        partial=True,
+                                        data={
                                             'id': mentioned.get('id'),
-                                            'name': name,
+                                            # a nickname is not the user's name
+                                            'name': None if mentioned.get('nickname') is True else name,
                                             'profilePicture': mentioned.get('avatar'),
-                                            'bot': self.created_by_bot
-                                        }))
-
-                        elif element['type'] == 'reaction':
-                            rtext = element['nodes'][0]['leaves'][0]['text']
-                            content += str(rtext)
-                        elif element['type'] == 'link':
-                            link_text = element['nodes'][0]['leaves'][0]['text']
-                            link_href = element['data']['href']
-                            link = Link(link_href, name=link_text)
-                            self.links.append(link)
-                            if link.url != link.name:
-                                content += f'[{link.name}]({link.url})'
-                            else:
-                                content += link.url
-                        elif element['type'] == 'channel':
-                            channel = element['data']['channel']
-                            content += f'<#{channel.get("id")}>'
-
-                            channel = self._state._get_team_channel(self.team_id, channel.get('id'))
-                            if channel:
-                                self.channel_mentions.append(channel)
-
-                content += '\n'
-
-            elif node_type == 'markdown-plain-text':
-                content += node['nodes'][0]['leaves'][0]['text']
+                                            'colour': parse_hex_number(mentioned.get('color', '000000').strip('#')),
+                                            'nickname': mentioned.get('name') if mentioned.get('nickname') is True else None,
+                                        }
+                                    ))
+                                else:
+                                    self._mentions.append(self._state.create_user(partial=True, data={
+                                        'id': mentioned.get('id'),
+                                        'name': name,
+                                        'profilePicture': mentioned.get('avatar'),
+                                    }))
+
+                    elif element['type'] == 'link':
+                        link_text = element['nodes'][0]['leaves'][0]['text']
+                        link_href = element['data']['href']
+                        self._links.append(Link(link_href, name=link_text))
+
+                    elif element['type'] == 'channel':
+                        channel = element['data']['channel']
+                        self._raw_channel_mentions.append(f'<#{channel.get("id")}>')
+                        channel = self._state._get_team_channel(self.team_id, channel.get('id'))
+                        if channel:
+                            self._channel_mentions.append(channel)
 
             elif node_type == 'webhookMessage':
                 if node['data'].get('embeds'):
                     for msg_embed in node['data']['embeds']:
-                        self.embeds.append(Embed.from_dict(msg_embed))
-
-            elif node_type == 'block-quote-container':
-                text = str(node['nodes'][0]['nodes'][0]['leaves'][0]['text'])
-                content += f'\n> {text}\n'
+                        self._embeds.append(Embed.from_dict(msg_embed))
 
             elif node_type in ['image', 'video']:
                 attachment = Attachment(state=self._state, data=node)
-                self.attachments.append(attachment)
-
-        content = content.rstrip('\n')
-        # strip ending of newlines in case a paragraph node ended without
-        # another paragraph node
-        return content
+                self._attachments.append(attachment)
 
     async def delete(self):
         """|coro|
@@ -448,11 +518,15 @@ class ChatMessage:
         """|coro|
 
         Edit this message.
+
+        Attachments that are kept are sent back by URL, so they are never
+        downloaded or uploaded again. To keep some of them while adding new
+        files, pass them in ``files`` alongside the new :class:`File` objects.
         """
         payload = {
             'old_content': self.content,
             'old_embeds': [embed.to_dict() for embed in self.embeds],
-            'old_files': [await attachment.to_file() for attachment in self.attachments]
+            'old_attachments': self.attachments
         }
         if content:
             payload['content'] = content
@@ -463,14 +537,12 @@ class ChatMessage:
         if file:
             files = [file, *(files or [])]
         if files is not None:
-            pl_files = []
+            files = list(files)
             for file in files:
-                file.type = MediaType.attachment
                 if file.url is None:
-                    await file._upload(self._state)
-                pl_files.append(file)
-
-            payload['files'] = pl_files
+                    file.set_media_type(MediaType.attachment)
+            await self._state.upload_files(files)
+            payload['files'] = files
 
         await self._state.edit_message(self.channel_id, self.id, **payload)
 
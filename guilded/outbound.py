@@ -0,0 +1,200 @@
+"""
+MIT License
+
+Copyright (c) 2020-present shay (shayypy)
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+------------------------------------------------------------------------------
+
+This project includes code from https://github.com/Rapptz/discord.py, which is
+available under the MIT license:
+
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+import asyncio
+from collections import deque
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class _PendingSend:
+    __slots__ = ('content', 'extra_payload', 'share_urls', 'future')
+
+    def __init__(self, content, extra_payload, share_urls, future):
+        self.content = content
+        self.extra_payload = extra_payload
+        self.share_urls = share_urls
+        self.future = future
+
+    @property
+    def coalescible(self):
+        # only plain text with no replies, privacy flags or shares can be
+        # merged into another message without changing what it means
+        return (
+            not self.extra_payload
+            and not self.share_urls
+            and all(isinstance(node, str) for node in self.content)
+        )
+
+
+class OutboundQueue:
+    """Serializes the messages sent to each channel, merging bursts of
+    plain text into fewer requests.
+
+    Each channel has its own queue, worked through one message at a time so
+    that sends arrive in the order they were made. Because a channel's
+    messages share a rate limit bucket, a queue that is waiting out a rate
+    limit keeps collecting sends and then merges them.
+
+    Consecutive text-only sends queued within ``window`` seconds of each
+    other are merged into a single message, with each send as its own
+    content node. Every caller still gets back the response for the message
+    that their content was sent in.
+
+    Parameters
+    ------------
+    http: :class:`HTTPClient`
+        The HTTP client to send messages with.
+    window: :class:`float`
+        How many seconds to wait for more text after a text-only send before
+        sending it. ``0`` sends immediately unless the channel is rate
+        limited.
+    limit: :class:`int`
+        The most sends to merge into one message.
+    """
+    def __init__(self, http, *, window=0.05, limit=10):
+        self.http = http
+        self.window = window
+        self.limit = limit
+
+        self._queues = {}
+        self._workers = {}
+
+    @property
+    def queued(self):
+        """:class:`dict`: The number of sends waiting in each channel's queue."""
+        return {channel_id: len(queue) for channel_id, queue in self._queues.items() if queue}
+
+    def send(self, channel_id, content, extra_payload=None, *, share_urls=None):
+        """Queue a message to be sent to a channel.
+
+        Returns
+        ---------
+        :class:`asyncio.Future`
+            Resolves to a tuple of the API response and the payload that was
+            sent, like awaiting the request from
+            :meth:`HTTPClient.send_message`.
+        """
+        future = asyncio.get_event_loop().create_future()
+        queue = self._queues.get(channel_id)
+        if queue is None:
+            queue = self._queues[channel_id] = deque()
+        queue.append(_PendingSend(list(content), extra_payload, share_urls, future))
+
+        if channel_id not in self._workers:
+            self._workers[channel_id] = asyncio.ensure_future(self._work(channel_id))
+
+        return future
+
+    def _take_batch(self, queue):
+        first = queue.popleft()
+        batch = [first]
+        if first.coalescible:
+            while queue and len(batch) < self.limit and queue[0].coalescible:
+                batch.append(queue.popleft())
+        return batch
+
+    async def _wait_for_bucket(self, channel_id):
+        # waiting out a rate limit here, rather than in the request, lets
+        # sends made in the meantime join the next batch
+        lock = self.http._get_bucket_lock('POST', f'/channels/{channel_id}/messages')
+        if lock is not None and lock.locked():
+            async with lock:
+                pass
+
+    async def _work(self, channel_id):
+        queue = self._queues[channel_id]
+        try:
+            while queue:
+                if queue[0].coalescible and self.window > 0:
+                    await asyncio.sleep(self.window)
+                await self._wait_for_bucket(channel_id)
+
+                batch = [pending for pending in self._take_batch(queue) if not pending.future.done()]
+                if not batch:
+                    continue
+
+                content = [node for pending in batch for node in pending.content]
+                first = batch[0]
+                try:
+                    request, payload = self.http.send_message(
+                        channel_id, content, first.extra_payload, share_urls=first.share_urls
+                    )
+                    response = await request
+                except asyncio.CancelledError:
+                    for pending in batch:
+                        pending.future.cancel()
+                    raise
+                except Exception as exc:
+                    for pending in batch:
+                        if not pending.future.done():
+                            pending.future.set_exception(exc)
+                else:
+                    if len(batch) > 1:
+                        log.debug('Merged %s sends to channel %s into one message.', len(batch), channel_id)
+                    for pending in batch:
+                        if not pending.future.done():
+                            pending.future.set_result((response, payload))
+        finally:
+            del self._workers[channel_id]
+            if queue:
+                # only reached when cancelled
+                for pending in queue:
+                    pending.future.cancel()
+                queue.clear()
+            del self._queues[channel_id]
+
+    def close(self):
+        """Cancel every queued send."""
+        for worker in list(self._workers.values()):
+            worker.cancel()
@@ -51,6 +51,7 @@ DEALINGS IN THE SOFTWARE.
 
 import asyncio
 import datetime
+import time
 
 from guilded.abc import TeamChannel
 
@@ -59,7 +60,7 @@ from .channel import ChatChannel, Thread
 from .errors import NotFound
 from .gateway import GuildedWebSocket
 from .user import Member
-from .utils import ISO8601
+from .utils import lazy_timestamp
 
 
 class SocialInfo:
@@ -81,6 +82,8 @@ class TeamTimezone(datetime.tzinfo):
 
 class Team:
     """Represents a team (or "server") in Guilded."""
+    created_at = lazy_timestamp()
+
     def __init__(self, *, state, data, ws=None):
         self._state = state
         self.ws = ws
@@ -90,7 +93,7 @@ class Team:
         self.owner_id = data.get('ownerId')
         self.name = data.get('name')
         self.subdomain = data.get('subdomain')
-        self.created_at = ISO8601(data.get('createdAt'))
+        self.created_at = data.get('createdAt')
         self.bio = data.get('bio') or ''
         self.description = data.get('description') or ''
         self.discord_guild_id = data.get('discordGuildId')
@@ -124,6 +127,10 @@ class Team:
         self._follower_count = data.get('followerCount') or 0
         self._member_count = data.get('memberCount') or data.get('measurements', {}).get('numMembers') or 0
 
+        # populated by Client when this team's members/channels are cached
+        self._cache_task = None
+        self.cache_timings = {}
+
     def __str__(self):
         return self.name
 
@@ -163,17 +170,21 @@ class Team:
         have all the desired information due to the Get Team Members endpoint
         returning partial objects.
         """
-        return list(self._state._team_members.get(self.id, {}).values())
+        return self._state._team_members.group_values(self.id)
 
     @property
     def channels(self):
         """The cached list of channels in this team."""
-        return [channel for channel in self._state._team_channels.values() if channel.team_id == self.id]
+        return self._state._team_channels.group_values(self.id)
 
     def get_member(self, id):
         """Get a member by their ID from the internal cache."""
         return self._state._get_team_member(self.id, id)
 
+    def get_channel(self, id):
+        """Get a channel by its ID from the internal cache."""
+        return self._state._get_team_channel(self.id, id)
+
     async def ws_connect(self, client):
         """|coro|
 
@@ -269,7 +280,7 @@ class Team:
         """
         request = self._state.get_channel(id)
         data = await request
-        channel = self._state.create_channel(data)
+        channel = self._state.create_channel(data=data['metadata']['channel'], team=self)
         return channel
 
     async def getch_channel(self, id):
@@ -292,6 +303,54 @@ class Team:
 
         return member_list
 
+    async def fill_cache(self, *, members=True, channels=True):
+        """|coro|
+
+        Fetch this team's members and/or channels concurrently and store
+        them in the internal cache.
+
+        Parameters
+        -----------
+        members: Optional[:class:`bool`]
+            Whether to fetch and cache members. Defaults to ``True``.
+        channels: Optional[:class:`bool`]
+            Whether to fetch and cache channels. Defaults to ``True``.
+
+        Returns
+        --------
+        :class:`dict`
+            The number of seconds spent on each part of the operation,
+            keyed by ``members``, ``channels`` and ``total``. This is also
+            stored as :attr:`.cache_timings`.
+        """
+        timings = {}
+
+        async def fill_members():
+            start = time.perf_counter()
+            for member in await self.fetch_members():
+                self._state.add_to_member_cache(member)
+            timings['members'] = time.perf_counter() - start
+
+        async def fill_channels():
+            start = time.perf_counter()
+            for channel in await self.fetch_channels():
+                if channel is None:
+                    continue
+                self._state.add_to_team_channel_cache(channel)
+            timings['channels'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        coros = []
+        if members and self._state._cache_policy.caches('members'):
+            coros.append(fill_members())
+        if channels and self._state._cache_policy.caches('channels'):
+            coros.append(fill_channels())
+        await asyncio.gather(*coros)
+        timings['total'] = time.perf_counter() - start
+
+        self.cache_timings = timings
+        return timings
+
     async def fetch_member(self, id: str, *, full=True):
         """|coro|
 
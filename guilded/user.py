@@ -51,7 +51,7 @@ DEALINGS IN THE SOFTWARE.
 
 import guilded.abc
 
-from .utils import ISO8601
+from .utils import lazy_timestamp
 from .file import File, MediaType
 
 
@@ -70,13 +70,19 @@ class Device:
     active: :class:`bool`
         Whether this device is "active". This seems to always be ``True``.
     """
+    __slots__ = ('type', 'id', '_last_online', 'active')
+
+    last_online = lazy_timestamp()
+
     def __init__(self, data):
         self.type = data.get('type')
         self.id = data.get('id')
-        self.last_online = ISO8601(data.get('lastOnline'))
+        self.last_online = data.get('lastOnline')
         self.active = data.get('isActive', False)
 
 class User(guilded.abc.User, guilded.abc.Messageable):
+    __slots__ = ()
+
     async def block(self):
         """|coro|
 
@@ -119,6 +125,46 @@ class User(guilded.abc.User, guilded.abc.Messageable):
         """
         await self._state.delete_friend_request(self.id)
 
+def flatten_user(cls):
+    # exposes the shared user's profile attributes on a class that stores it
+    # as _user, so that they are read from and written to one place
+    def delegate(name):
+        def getter(self):
+            return getattr(self._user, name)
+
+        def setter(self, value):
+            setattr(self._user, name, value)
+
+        return property(getter, setter, doc=f'Equivalent to :attr:`User.{name}`.')
+
+    for name in (
+        'name',
+        'subdomain',
+        'presence',
+        'blocked_at',
+        'online_at',
+        'created_at',
+        'bot',
+        'friend_status',
+        'friend_requested_at',
+        'email',
+        'service_email',
+        'games',
+        'bio',
+        'tagline',
+        'status',
+        'avatar_url',
+        'banner_url',
+        'moderation_status',
+        'badges',
+        'stonks',
+    ):
+        if name not in cls.__dict__:
+            setattr(cls, name, delegate(name))
+
+    return cls
+
+@flatten_user
 class Member(User):
     """Represents a member of a team.
 
@@ -138,18 +184,67 @@ class Member(User):
     nick: Optional[:class:`str`]
         This member's nickname, if any.
     """
+    __slots__ = ('_user', 'team', 'team_id', 'nick', 'xp', '_joined_at')
+
+    # payload keys that describe the membership rather than the user
+    MEMBER_KEYS = frozenset(('teamId', 'nickname', 'teamXp', 'joinDate', 'roleIds', 'membershipRole', 'colour', 'color'))
+
+    joined_at = lazy_timestamp()
+
     def __init__(self, *, state, data, **extra):
-        super().__init__(state=state, data=data)
+        self._state = state
+        user = data.get('user')
+        if user is None:
+            user = {key: value for key, value in data.items() if key not in self.MEMBER_KEYS}
+        self._data = {key: value for key, value in data.items() if key in self.MEMBER_KEYS}
+
+        # the profile is shared with every other membership of the same user
+        self._user = state._store_user(user, partial=extra.get('partial', False))
+        self.id = self._user.id
+        self.type = None
+        self._channel_id = None
+
         self.team = extra.get('team') or data.get('team')
         self.team_id = data.get('teamId') or (self.team.id if self.team else None)
         self.nick = data.get('nickname')
         self.xp = data.get('teamXp')
-        self.joined_at = ISO8601(data.get('joinDate'))
+        self.joined_at = data.get('joinDate')
         self.colour = data.get('colour') or data.get('color')
 
     def __repr__(self):
         return f'<Member id={self.id} name={self.name} team={repr(self.team)}>'
 
+    def _update(self, data):
+        # applies a partial payload from the gateway. profile changes go to
+        # the shared user, so every membership sees them
+        user = {key: value for key, value in data.items() if key not in self.MEMBER_KEYS}
+        if user:
+            self._user._update(user)
+
+        member = {key: value for key, value in data.items() if key in self.MEMBER_KEYS}
+        self._data = {**self._data, **member}
+        if 'nickname' in member:
+            self.nick = member['nickname']
+        if 'teamXp' in member:
+            self.xp = member['teamXp']
+        if 'joinDate' in member:
+            self.joined_at = member['joinDate']
+
+    @property
+    def user(self):
+        """:class:`User`: The user this member represents. It is shared
+        between every team the user is a member of."""
+        return self._user
+
+    @property
+    def roles(self):
+        """List[:class:`int`]: The IDs of this member's roles, if known."""
+        return self._data.get('roleIds') or []
+
+    @roles.setter
+    def roles(self, value):
+        self._data = {**self._data, 'roleIds': value}
+
     @property
     def color(self):
         return self.colour
@@ -206,6 +301,8 @@ class ClientUser(guilded.abc.User):
         This account's requested friends. Could be partial (only ID) if the
         user was not cached.
     """
+    __slots__ = ('devices', '_accepted_friends', '_pending_friends', '_requested_friends')
+
     def __init__(self, *, state, data):
         super().__init__(state=state, data=data)
         user = data.get('user', data)
@@ -225,7 +322,7 @@ class ClientUser(guilded.abc.User):
                 )
             else:
                 friend_user.friend_status = partial_friend['friendStatus']
-                friend_user.friend_requested_at = ISO8601(partial_friend['createdAt'])
+                friend_user.friend_requested_at = partial_friend['createdAt']
 
             if friend_user.friend_status == 'accepted':
                 self._accepted_friends[friend_user.id] = friend_user
@@ -51,12 +51,48 @@ DEALINGS IN THE SOFTWARE.
 
 import asyncio
 import datetime
+import json
 import re
 from operator import attrgetter
 from uuid import uuid1
 
 from .colour import Colour
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+# the fastest available json backend is picked once, at import time
+if orjson is not None:
+    JSON_BACKEND = 'orjson'
+
+    def _to_json(obj):
+        return orjson.dumps(obj).decode('utf-8')
+
+    _from_json = orjson.loads
+
+elif ujson is not None:
+    JSON_BACKEND = 'ujson'
+
+    def _to_json(obj):
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+
+    _from_json = ujson.loads
+
+else:
+    JSON_BACKEND = 'json'
+
+    def _to_json(obj):
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=True)
+
+    _from_json = json.loads
+
 GUILDED_EPOCH_DATETIME = datetime.datetime(2016, 1, 1)
 GUILDED_EPOCH_ISO8601 = GUILDED_EPOCH_DATETIME.isoformat() + 'Z'
 GUILDED_EPOCH = int(GUILDED_EPOCH_DATETIME.timestamp())
@@ -68,6 +104,23 @@ def ISO8601(string: str):
     if string is None:
         return None
 
+    # fast path for the formats that Guilded sends, which are always UTC:
+    # 2021-01-01T00:00:00.000Z and 2021-01-01T00:00:00Z
+    length = len(string)
+    if length >= 20 and string[-1] == 'Z' and string[10] == 'T' and (length == 20 or (length > 21 and string[19] == '.')):
+        try:
+            return datetime.datetime(
+                int(string[0:4]),
+                int(string[5:7]),
+                int(string[8:10]),
+                int(string[11:13]),
+                int(string[14:16]),
+                int(string[17:19]),
+                int(string[20:-1].ljust(6, '0')[:6]) if length > 20 else 0
+            )
+        except ValueError:
+            pass
+
     try:
         return datetime.datetime.strptime(string, '%Y-%m-%dT%H:%M:%S.%fZ')
     except:
@@ -77,6 +130,28 @@ def ISO8601(string: str):
             pass
         raise TypeError(f'{string} is not a valid ISO8601 datetime.')
 
+class lazy_timestamp:
+    """A model attribute that holds the raw ISO8601 string it is set to and
+    only parses it, with :func:`ISO8601`, when it is first read.
+
+    The value is stored in an attribute of the same name prefixed with an
+    underscore, which slotted classes must declare.
+    """
+    def __set_name__(self, owner, name):
+        self.name = '_' + name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = getattr(instance, self.name)
+        if isinstance(value, str):
+            value = ISO8601(value)
+            setattr(instance, self.name, value)
+        return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.name, value)
+
 def hyperlink(link: str, *, title=None):
     """A helper function to make links clickable when sent into chat."""
     return f'[{title or link}]({link})'
@@ -37,5 +37,8 @@ setuptools.setup(
         'Natural Language :: English'
     ],
     python_requires='>=3.6',
-    install_requires=requirements
+    install_requires=requirements,
+    extras_require={
+        'speed': ['orjson>=3.5.4']
+    }
 )